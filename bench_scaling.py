@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the WNR pipeline on synthetic chat exports.
+
+For each (messages, boats) point of the grid, synthetic_chat.py writes a
+deterministic export, and each stage of the pipeline is timed on it in a
+fresh subprocess (so caches and peak memory do not leak between points):
+
+    split   split_chat_by_wednesday.py segments
+    parse   EnhancedChatParser.parse_chat_file
+    score   process_weeks + fold_weeks (in-process, no week cache)
+    write   results.json, season_columns.json and per-week files
+    final   generate_final_results on season_columns.json (table, markdown)
+
+The JSON report records the timings and peak RSS of every point. Pass an
+earlier report as --baseline to flag stages that got slower.
+
+Usage: python3 bench_scaling.py [--messages 1000 10000 ...] [--boats 10 100 ...] [--report PATH] [--baseline PATH]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+REPORT_FORMAT = 'wnr-scaling/1'
+DEFAULT_MESSAGES = [1_000, 10_000, 100_000]
+DEFAULT_BOATS = [10, 100, 500]
+STAGES = ['split', 'parse', 'score', 'write', 'final']
+# A stage this much slower than the baseline is reported as a regression
+REGRESSION_RATIO = 1.25
+# Stages faster than this are too noisy to compare
+MIN_COMPARABLE_SECONDS = 0.05
+
+
+def run_point(messages: int, boats: int, starters: int, seed: int) -> Dict:
+    """Generate one export and time every stage on it (in this process)"""
+    import generate_final_results
+    import split_chat_by_wednesday
+    from output_writer import OutputWriter
+    from parse_chat import EnhancedChatParser, write_results_json, write_season_columns
+    from synthetic_chat import generate_chat
+
+    timings: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        start = time.perf_counter()
+        summary = generate_chat(work_dir, messages=messages, boats=boats, starters=starters, seed=seed)
+        generated = time.perf_counter() - start
+        chat_path = os.path.join(work_dir, '_chat.txt')
+        boats_path = os.path.join(work_dir, 'boats.json')
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                split_chat_by_wednesday.main()
+                timings['split'] = time.perf_counter() - start
+
+                parser = EnhancedChatParser(chat_path, boats_path)
+                start = time.perf_counter()
+                parser.parse_chat_file()
+                timings['parse'] = time.perf_counter() - start
+
+                start = time.perf_counter()
+                processed = parser.process_weeks(parser.weekly_races)
+                results = parser.fold_weeks(processed[date] for date in sorted(processed))
+                timings['score'] = time.perf_counter() - start
+
+                start = time.perf_counter()
+                with OutputWriter() as writer:
+                    write_results_json(results, 'results.json', writer)
+                    write_season_columns(results, 'season_columns.json', writer)
+                    parser.write_week_files('.', writer=writer)
+                timings['write'] = time.perf_counter() - start
+
+                start = time.perf_counter()
+                results_data, source = generate_final_results.load_results(season_path='season_columns.json')
+                if results_data:
+                    df = generate_final_results.create_results_table(results_data)
+                    generate_final_results.generate_markdown_table(df, results_data, source)
+                timings['final'] = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+        chat_bytes = os.path.getsize(chat_path)
+
+    return {
+        'messages': summary['messages'],
+        'boats': boats,
+        'weeks': summary['weeks'],
+        'starters': min(starters, boats),
+        'chat_bytes': chat_bytes,
+        'scored_weeks': len(results['series']['weeks']),
+        'generate_seconds': round(generated, 4),
+        'stages': {stage: round(seconds, 4) for stage, seconds in timings.items()},
+        'total_seconds': round(sum(timings.values()), 4),
+        'messages_per_second': round(summary['messages'] / timings['parse']) if timings['parse'] else None,
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def _run_in_subprocess(messages: int, boats: int, starters: int, seed: int) -> Dict:
+    here = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run(
+        [sys.executable, os.path.join(here, 'bench_scaling.py'), '--point', str(messages), str(boats),
+         '--starters', str(starters), '--seed', str(seed)],
+        check=True, capture_output=True, text=True, cwd=here).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict, baseline: Dict) -> List[str]:
+    """Stages of report runs more than REGRESSION_RATIO slower than the same baseline point"""
+    previous = {(run['messages'], run['boats']): run for run in baseline.get('runs', [])}
+    regressions = []
+    for run in report['runs']:
+        old = previous.get((run['messages'], run['boats']))
+        if old is None:
+            continue
+        for stage, seconds in run['stages'].items():
+            before = old['stages'].get(stage)
+            if before and max(before, seconds) >= MIN_COMPARABLE_SECONDS and seconds > before * REGRESSION_RATIO:
+                regressions.append(f"{run['messages']} messages / {run['boats']} boats: {stage} "
+                                   f"{before:.3f}s -> {seconds:.3f}s ({seconds / before:.2f}x)")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--messages', type=int, nargs='+', default=DEFAULT_MESSAGES, metavar='N',
+                            help="message counts to test (up to 1000000)")
+    arg_parser.add_argument('--boats', type=int, nargs='+', default=DEFAULT_BOATS, metavar='N',
+                            help="fleet sizes to test")
+    arg_parser.add_argument('--starters', type=int, default=20, help="boats per race (default: 20)")
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--report', default='scaling_report.json', help="JSON report to write")
+    arg_parser.add_argument('--baseline', metavar='PATH', help="earlier report to compare against")
+    arg_parser.add_argument('--point', type=int, nargs=2, metavar=('MESSAGES', 'BOATS'), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.point:
+        print(json.dumps(run_point(args.point[0], args.point[1], args.starters, args.seed)))
+        return
+
+    report = {
+        'format': REPORT_FORMAT,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'runs': [],
+    }
+    print(f"{'messages':>9} {'boats':>5} {'weeks':>5} " + ' '.join(f"{s:>8}" for s in STAGES) + f" {'msg/s':>9} {'RSS MB':>7}")
+    for messages in args.messages:
+        for boats in args.boats:
+            run = _run_in_subprocess(messages, boats, args.starters, args.seed)
+            report['runs'].append(run)
+            print(f"{run['messages']:>9} {boats:>5} {run['weeks']:>5} "
+                  + ' '.join(f"{run['stages'][s]:>8.3f}" for s in STAGES)
+                  + f" {run['messages_per_second']:>9,} {run['peak_rss_kb'] / 1024:>7.1f}", flush=True)
+
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.report}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f))
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No stage more than {REGRESSION_RATIO}x slower than {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the WNR chat parsing pipeline.
+
+Each benchmark times the current implementation against the reference
+implementation it replaced, checks that both produce identical output, and
+prints throughput before and after.
+
+Usage: python3 benchmark.py [claims] [messages] [timestamps] [final_loaders] [season_table] [jobs] [--chat _chat.txt] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+import generate_final_results
+from evidence import cited_messages, expand_claims
+from parse_chat import (EnhancedChatParser, Message, MESSAGE_LINE_RE, UNICODE_SPACES_RE, write_results_json,
+                        write_season_columns)
+from timestamps import decode_date, decode_timestamp
+
+# Weeks in the synthetic season used by the final-results loader benchmark
+SEASON_WEEKS = 520
+# Worker processes the jobs benchmark compares against in-process (-j 1) runs
+PARALLEL_JOBS = 4
+
+
+def legacy_extract_individual_claims(parser: EnhancedChatParser, messages: List[Message]) -> List[Dict]:
+    """Per-sentence regex cascade used by extract_individual_claims before the single-pass scanner"""
+    claims = []
+
+    for msg in messages:
+        text = msg.text
+        text_lower = text.lower()
+
+        if msg.author == 'Wednesday Night Racing':
+            continue
+
+        if msg.timestamp.hour < 19:
+            continue
+
+        complete_order = parser.extract_complete_finish_order(text)
+        if complete_order:
+            claims.append({
+                'type': 'complete_finish_order',
+                'finish_order': complete_order,
+                'text': text,
+                'author': msg.author,
+                'timestamp': msg.timestamp.strftime("%Y-%m-%d %I:%M %p")
+            })
+            continue
+
+        sentences = re.split(r'[.!?]', text)
+
+        author_boat = parser.author_to_boat.get(msg.author.lower(), None)
+
+        for sentence in sentences:
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+
+            sentence_lower = sentence.lower()
+
+            ahead_match = re.search(r'([a-zA-Z0-9\s\-]+?)\s+ahead(?:\s|$|[.,])', sentence_lower)
+            if ahead_match and author_boat:
+                boat_name = ahead_match.group(1).strip()
+                normalized_boat, aliases = parser.normalize_boat_name(boat_name)
+                if normalized_boat and len(normalized_boat) > 1:
+                    claims.append({
+                        'type': 'relative_position',
+                        'boat_ahead': normalized_boat,
+                        'boat_behind': author_boat,
+                        'text': sentence,
+                        'author': msg.author,
+                        'timestamp': msg.timestamp.strftime("%Y-%m-%d %I:%M %p"),
+                        'aliases_used': aliases
+                    })
+
+            behind_match = re.search(r'([a-zA-Z0-9\s\-]+?)\s+behind(?:\s|$|[.,])', sentence_lower)
+            if behind_match and author_boat:
+                boat_name = behind_match.group(1).strip()
+                normalized_boat, aliases = parser.normalize_boat_name(boat_name)
+                if normalized_boat and len(normalized_boat) > 1:
+                    claims.append({
+                        'type': 'relative_position',
+                        'boat_ahead': author_boat,
+                        'boat_behind': normalized_boat,
+                        'text': sentence,
+                        'author': msg.author,
+                        'timestamp': msg.timestamp.strftime("%Y-%m-%d %I:%M %p"),
+                        'aliases_used': aliases
+                    })
+
+        novice_pattern = r'(\d+)\s*(?:novice|novices|nv|nvs)\b'
+        novice_matches = re.findall(novice_pattern, text_lower)
+
+        if novice_matches:
+            boat = parser.author_to_boat.get(msg.author.lower(), 'UNKNOWN')
+            claims.append({
+                'type': 'novice',
+                'boat': boat,
+                'count': int(novice_matches[0]),
+                'text': text,
+                'author': msg.author,
+                'timestamp': msg.timestamp.strftime("%Y-%m-%d %I:%M %p")
+            })
+
+        if 'dsq' in text_lower or 'dnf' in text_lower:
+            penalty_type = 'DSQ' if 'dsq' in text_lower else 'DNF'
+            boat = parser.author_to_boat.get(msg.author.lower(), 'UNKNOWN')
+            claims.append({
+                'type': 'penalty',
+                'boat': boat,
+                'penalty_type': penalty_type,
+                'text': text,
+                'author': msg.author,
+                'timestamp': msg.timestamp.strftime("%Y-%m-%d %I:%M %p")
+            })
+
+    return claims
+
+
+def legacy_create_results_table(results_data: Dict) -> pd.DataFrame:
+    """Cell-by-cell season table built by create_results_table before the single pivot"""
+    
+    # Get all boats and race dates
+    all_boats = set()
+    race_dates = sorted(results_data.keys())
+    
+    # Collect all boat names from all races and normalize case
+    boat_name_mapping = {}  # Maps lowercase to proper case name
+    for race_data in results_data.values():
+        for result in race_data['results']:
+            boat_name = result['boat']
+            boat_lower = boat_name.lower()
+            
+            # Use the first occurrence as the canonical name, or prefer proper case
+            if boat_lower not in boat_name_mapping:
+                boat_name_mapping[boat_lower] = boat_name
+            else:
+                # If we have a version with proper capitalization, prefer it
+                existing = boat_name_mapping[boat_lower]
+                if boat_name != existing:
+                    # Choose the one with more capitals (better formatting)
+                    if sum(1 for c in boat_name if c.isupper()) > sum(1 for c in existing if c.isupper()):
+                        boat_name_mapping[boat_lower] = boat_name
+    
+    all_boats = sorted(boat_name_mapping.values())
+    
+    # Create a DataFrame with boats as index and race dates as columns
+    df = pd.DataFrame(index=all_boats, columns=race_dates)
+    
+    # Fill in the scores for each boat in each race
+    for date, race_data in results_data.items():
+        for result in race_data['results']:
+            # Normalize boat name to canonical version
+            boat_lower = result['boat'].lower()
+            canonical_boat = boat_name_mapping[boat_lower]
+            
+            pos = result.get('pos')
+            score = result.get('score', '')
+            status = result.get('status', 'FIN')
+            
+            # Format the display value
+            if status == 'DNC':
+                df.loc[canonical_boat, date] = f"DNC({score})"
+            elif status == 'DSQ':
+                df.loc[canonical_boat, date] = f"DSQ({score})"
+            elif status == 'DNF':
+                df.loc[canonical_boat, date] = f"DNF({score})"
+            elif pos is not None:
+                df.loc[canonical_boat, date] = f"{pos}({score})"
+            else:
+                df.loc[canonical_boat, date] = str(score) if score != '' else 'DNC'
+    
+    # Fill NaN values with 'DNC' for races where boat didn't participate
+    df = df.fillna('DNC')
+    
+    return df
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    """Fastest wall time of ``repeat`` calls"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _report(name: str, count: int, unit: str, before: float, after: float):
+    print(f"{name}: {count} {unit}")
+    print(f"  before: {count / before:12,.0f} {unit}/s  ({before * 1000:.2f} ms)")
+    print(f"  after:  {count / after:12,.0f} {unit}/s  ({after * 1000:.2f} ms)")
+    print(f"  speedup: {before / after:.2f}x")
+
+
+def bench_claims(chat_file: str, repeat: int):
+    """Claim extraction over every message of the export"""
+    parser = EnhancedChatParser(chat_file)
+    parser.parse_chat_file()
+    # Every message goes through the extractor, not only race-night ones
+    messages = [Message(*m)._replace(timestamp=m.timestamp.replace(hour=20)) for m in parser.messages]
+
+    expected = legacy_extract_individual_claims(parser, messages)
+    claims = parser.extract_individual_claims(messages)
+    actual = expand_claims(claims, cited_messages(messages, claims))
+    if actual != expected:
+        raise SystemExit("claims: single-pass scanner output differs from the reference cascade")
+
+    before = _best_of(lambda: legacy_extract_individual_claims(parser, messages), repeat)
+    after = _best_of(lambda: parser.extract_individual_claims(messages), repeat)
+    _report("claims", len(messages), "messages", before, after)
+
+
+def _retained_bytes(build: Callable[[], object]) -> int:
+    """Bytes still allocated once ``build`` returns, while its result is held"""
+    tracemalloc.start()
+    try:
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size
+
+
+def bench_messages(chat_file: str, repeat: int):
+    """Memory held by the parsed messages: namedtuple list vs the columnar store"""
+    def build_list():
+        parser = EnhancedChatParser(chat_file)
+        return [Message(*m) for m in parser.iter_messages()]
+
+    def build_store():
+        parser = EnhancedChatParser(chat_file)
+        parser.parse_chat_file()
+        return parser.messages
+
+    messages = build_list()
+    if list(map(tuple, build_store())) != list(map(tuple, messages)):
+        raise SystemExit("messages: columnar store differs from the parsed namedtuples")
+
+    before, after = _retained_bytes(build_list), _retained_bytes(build_store)
+    count = len(messages)
+    print(f"messages: {count} messages")
+    print(f"  before: {before / count:12,.1f} bytes/message  ({before:,} bytes)")
+    print(f"  after:  {after / count:12,.1f} bytes/message  ({after:,} bytes)")
+    print(f"  reduction: {before / after:.2f}x")
+
+
+def legacy_decode_timestamp(date_str: str, time_str: str) -> datetime:
+    """Unicode-space normalization + strptime, as _build_message did before timestamps.py"""
+    dt_str = UNICODE_SPACES_RE.sub(' ', f"{date_str}, {time_str}")
+    return datetime.strptime(dt_str, "%m/%d/%y, %I:%M:%S %p")
+
+
+def bench_timestamps(chat_file: str, repeat: int):
+    """Header timestamp decoding for every message of the export"""
+    with open(chat_file, 'r', encoding='utf-8') as f:
+        headers = [m.groups()[:2] for m in map(MESSAGE_LINE_RE.match, f.read().splitlines()) if m]
+    # Repeat the export's headers so the timing is not dominated by call overhead
+    headers = headers * max(1, 100_000 // max(1, len(headers)))
+
+    if [decode_timestamp(*h) for h in headers] != [legacy_decode_timestamp(*h) for h in headers]:
+        raise SystemExit("timestamps: arithmetic decoder differs from strptime")
+
+    def decode_cold():
+        decode_date.cache_clear()
+        return [decode_timestamp(*h) for h in headers]
+
+    before = _best_of(lambda: [legacy_decode_timestamp(*h) for h in headers], repeat)
+    after = _best_of(decode_cold, repeat)
+    _report("timestamps", len(headers), "timestamps", before, after)
+
+
+def _synthetic_season(results_dir: str, out_dir: str, weeks: int) -> str:
+    """Fill out_dir with ``weeks`` per-week .json/.md pairs cycled from results_dir
+    under consecutive Wednesday dates; returns the matching columnar season file"""
+    sources = sorted(name[:-5] for name in os.listdir(results_dir)
+                     if generate_final_results.WEEK_FILE_RE.match(name) and name.endswith('.json')
+                     and os.path.exists(os.path.join(results_dir, name[:-5] + '.md')))
+    start = date(2000, 1, 5)
+    season_weeks = []
+    for k in range(weeks):
+        source = sources[k % len(sources)]
+        week_date = (start + timedelta(weeks=k)).isoformat()
+        for ext in ('json', 'md'):
+            shutil.copyfile(os.path.join(results_dir, f"{source}.{ext}"), os.path.join(out_dir, f"{week_date}.{ext}"))
+        with open(os.path.join(results_dir, f"{source}.json"), 'r', encoding='utf-8') as f:
+            week = json.load(f)
+        week['date'] = week_date
+        season_weeks.append(week)
+    season_path = os.path.join(out_dir, 'season_columns.json')
+    write_season_columns({'series': {'weeks': season_weeks}}, season_path)
+    return season_path
+
+
+def bench_final_loaders(chat_file: str, repeat: int):
+    """generate_final_results input: markdown tables vs per-week JSON vs the columnar season file"""
+    with tempfile.TemporaryDirectory() as md_dir, tempfile.TemporaryDirectory() as json_dir:
+        season_path = _synthetic_season('results', json_dir, SEASON_WEEKS)
+        for name in os.listdir(json_dir):
+            if name.endswith('.md'):
+                shutil.move(os.path.join(json_dir, name), os.path.join(md_dir, name))
+
+        load_md = lambda: generate_final_results.load_results_from_markdown_files(md_dir)
+        load_json = lambda: generate_final_results.load_results(json_dir)[0]
+        load_columns = lambda: generate_final_results.load_results(season_path=season_path)[0]
+        expected = generate_final_results.create_results_table(load_md())
+        for name, load in (('JSON', load_json), ('columnar', load_columns)):
+            if not generate_final_results.create_results_table(load()).equals(expected):
+                raise SystemExit(f"final_loaders: {name} season table differs from the markdown one")
+
+        weeks = len(expected.columns)
+        before = _best_of(load_md, repeat)
+        _report("final_loaders (per-week JSON)", weeks, "weeks", before, _best_of(load_json, repeat))
+        _report("final_loaders (columnar season)", weeks, "weeks", before, _best_of(load_columns, repeat))
+
+
+def bench_season_table(chat_file: str, repeat: int):
+    """Season table construction (boats x weeks) for a synthetic season"""
+    with tempfile.TemporaryDirectory() as season_dir:
+        season_path = _synthetic_season('results', season_dir, SEASON_WEEKS)
+        results_data = generate_final_results.load_results(season_path=season_path)[0]
+
+    if not generate_final_results.create_results_table(results_data).equals(legacy_create_results_table(results_data)):
+        raise SystemExit("season_table: pivoted table differs from the cell-by-cell reference")
+
+    before = _best_of(lambda: legacy_create_results_table(results_data), repeat)
+    after = _best_of(lambda: generate_final_results.build_season_tables(results_data), repeat)
+    _report("season_table", len(results_data), "weeks", before, after)
+
+
+def _pipeline_outputs(chat_file: str, jobs: int, out_dir: str) -> Dict[str, bytes]:
+    """The bytes of results.json and every week file written for ``chat_file`` with
+    ``jobs`` worker processes, by path relative to out_dir"""
+    parser = EnhancedChatParser(chat_file, jobs=jobs)
+    write_results_json(parser.generate_results(), os.path.join(out_dir, 'results.json'))
+    parser.write_week_files(out_dir)
+    outputs = {}
+    for root, _, names in os.walk(out_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                outputs[os.path.relpath(path, out_dir)] = f.read()
+    return outputs
+
+
+def bench_jobs(chat_file: str, repeat: int):
+    """Per-week processing in-process (-j 1) vs PARALLEL_JOBS worker processes"""
+    with tempfile.TemporaryDirectory() as serial_dir, tempfile.TemporaryDirectory() as parallel_dir:
+        serial = _pipeline_outputs(chat_file, 1, serial_dir)
+        parallel = _pipeline_outputs(chat_file, PARALLEL_JOBS, parallel_dir)
+    differing = sorted(name for name in serial.keys() | parallel.keys() if serial.get(name) != parallel.get(name))
+    if differing:
+        raise SystemExit(f"jobs: -j {PARALLEL_JOBS} output differs from -j 1 in {', '.join(differing)}")
+
+    weeks = len(json.loads(serial['results.json'])['series']['weeks'])
+    before = _best_of(lambda: EnhancedChatParser(chat_file, jobs=1).generate_results(), repeat)
+    after = _best_of(lambda: EnhancedChatParser(chat_file, jobs=PARALLEL_JOBS).generate_results(), repeat)
+    _report(f"jobs (-j {PARALLEL_JOBS}, {len(serial)} identical files)", weeks, "weeks", before, after)
+
+
+BENCHMARKS = {
+    'claims': bench_claims,
+    'messages': bench_messages,
+    'timestamps': bench_timestamps,
+    'final_loaders': bench_final_loaders,
+    'season_table': bench_season_table,
+    'jobs': bench_jobs,
+}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('benchmarks', nargs='*', metavar='benchmark', help=f"one of {', '.join(BENCHMARKS)} (default: all)")
+    arg_parser.add_argument('--chat', default='_chat.txt', help="chat export to benchmark against")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="runs per implementation; the fastest is reported")
+    args = arg_parser.parse_args()
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        arg_parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    for name in args.benchmarks or BENCHMARKS:
+        BENCHMARKS[name](args.chat, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Compiled boat registry for a boats.json.
+
+boats.json is compiled once into everything the parser looks boats up with:
+alias keys normalized the way boat names are looked up (lowercase, single
+spaces), author keys lowercased, each canonical boat name interned so every
+mapping shares one string per boat, and the BoatResolver indexes (substring
+automaton, BK-tree) already built. The result is saved next to boats.json
+and reused while boats.json keeps its size and modification time, or failing
+that its SHA-256, so a batch over many series loads it in one read instead
+of rebuilding it per parser. Within a process, registries are also kept per
+path.
+
+In the saved file boats are referred to by their index in 'boats'.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import Dict, Optional
+
+from boat_resolver import BoatResolver
+from output_writer import atomic_write_bytes
+
+REGISTRY_VERSION = 1
+REGISTRY_SUFFIX = '.registry.json'
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+# abspath of boats.json -> registry loaded or built in this process
+_registries: Dict[str, 'BoatRegistry'] = {}
+
+
+def registry_path_for(boats_json_path: str) -> str:
+    """Where the compiled registry of a boats.json is kept"""
+    return boats_json_path + REGISTRY_SUFFIX
+
+
+def normalize_alias(name: str) -> str:
+    """An alias key as boat names are looked up: lowercase, single spaces"""
+    return WHITESPACE_RE.sub(' ', name.lower().strip())
+
+
+class BoatRegistry:
+    """Normalized boat mappings and a ready BoatResolver for one boats.json"""
+
+    def __init__(self, source: str, size: int, mtime_ns: int, sha256: str, boat_aliases: Dict[str, str],
+                 author_to_boat: Dict[str, str], resolver: BoatResolver):
+        self.source = source
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.sha256 = sha256
+        self.boat_aliases = boat_aliases
+        self.author_to_boat = author_to_boat
+        self.resolver = resolver
+        self._author_boats: Dict[str, Optional[str]] = {}  # author as written -> boat
+
+    def boat_for_author(self, author: str) -> Optional[str]:
+        """The boat an author sails, by their name as written in the chat"""
+        try:
+            return self._author_boats[author]
+        except KeyError:
+            boat = self._author_boats[author] = self.author_to_boat.get(author.lower())
+            return boat
+
+    @classmethod
+    def empty(cls, boats_json_path: str) -> 'BoatRegistry':
+        return cls(os.path.abspath(boats_json_path), -1, -1, hashlib.sha256(b'').hexdigest(), {}, {},
+                   BoatResolver({}, []))
+
+    @classmethod
+    def build(cls, boats_json_path: str) -> 'BoatRegistry':
+        """Compile a boats.json (an empty registry, with a warning, if missing or malformed)"""
+        try:
+            stat = os.stat(boats_json_path)
+            with open(boats_json_path, 'rb') as f:
+                raw = f.read()
+            data = json.loads(raw)
+            aliases, authors, rules = data['boat_aliases'], data['author_to_boat'], data.get('substring_aliases', [])
+        except FileNotFoundError:
+            print(f"Warning: {boats_json_path} not found. Using empty mappings.")
+            return cls.empty(boats_json_path)
+        except (KeyError, ValueError) as e:
+            print(f"Error loading {boats_json_path}: {e}")
+            return cls.empty(boats_json_path)
+        boats = {boat: sys.intern(boat) for boat in list(aliases.values()) + list(authors.values())}
+        boat_aliases = {normalize_alias(alias): boats[boat] for alias, boat in aliases.items()}
+        author_to_boat = {author.lower(): boats[boat] for author, boat in authors.items()}
+        rules = [dict(rule, boat=sys.intern(rule['boat'])) for rule in rules]
+        return cls(os.path.abspath(boats_json_path), stat.st_size, stat.st_mtime_ns, hashlib.sha256(raw).hexdigest(),
+                   boat_aliases, author_to_boat, BoatResolver(boat_aliases, rules))
+
+    @classmethod
+    def load(cls, registry_path: str) -> Optional['BoatRegistry']:
+        """A saved registry, or None if missing or unreadable"""
+        try:
+            with open(registry_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != REGISTRY_VERSION:
+                return None
+            boats = [sys.intern(boat) for boat in data['boats']]
+            boat_aliases = {alias: boats[i] for alias, i in data['boat_aliases'].items()}
+            author_to_boat = {author: boats[i] for author, i in data['author_to_boat'].items()}
+            resolver_data = data['resolver']
+            resolver_data['rules'] = [(boats[i], contains) for i, contains in resolver_data['rules']]
+            return cls(data['source'], data['size'], data['mtime_ns'], data['sha256'], boat_aliases, author_to_boat,
+                       BoatResolver.from_data(boat_aliases, resolver_data))
+        except (FileNotFoundError, KeyError, IndexError, TypeError, ValueError):
+            return None
+
+    def save(self, registry_path: str):
+        """Write the registry atomically (temp file + rename)"""
+        boats = sorted(set(self.boat_aliases.values()) | set(self.author_to_boat.values())
+                       | {boat for boat, _ in self.resolver.rules})
+        boat_ids = {boat: i for i, boat in enumerate(boats)}
+        resolver_data = self.resolver.to_data()
+        resolver_data['rules'] = [[boat_ids[boat], contains] for boat, contains in resolver_data['rules']]
+        data = {
+            'version': REGISTRY_VERSION,
+            'source': self.source,
+            'size': self.size,
+            'mtime_ns': self.mtime_ns,
+            'sha256': self.sha256,
+            'boats': boats,
+            'boat_aliases': {alias: boat_ids[boat] for alias, boat in self.boat_aliases.items()},
+            'author_to_boat': {author: boat_ids[boat] for author, boat in self.author_to_boat.items()},
+            'resolver': resolver_data,
+        }
+        atomic_write_bytes(registry_path, json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    def is_current(self, boats_json_path: str) -> bool:
+        """True while boats.json has the size and modification time it was compiled at"""
+        try:
+            stat = os.stat(boats_json_path)
+        except FileNotFoundError:
+            return False
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+    def same_contents(self, boats_json_path: str) -> bool:
+        """True if boats.json still hashes to what was compiled (e.g. touched or checked out again)"""
+        try:
+            with open(boats_json_path, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest() == self.sha256
+        except FileNotFoundError:
+            return False
+
+
+def load_boat_registry(boats_json_path: str = 'boats.json', registry_path: Optional[str] = None) -> BoatRegistry:
+    """The registry of a boats.json: this process's copy or the saved one while
+    still current, else a freshly compiled (and saved) one"""
+    source = os.path.abspath(boats_json_path)
+    registry = _registries.get(source)
+    if registry is not None and registry.is_current(boats_json_path):
+        return registry
+    if not os.path.exists(boats_json_path):
+        return BoatRegistry.build(boats_json_path)
+    registry_path = registry_path or registry_path_for(boats_json_path)
+    registry = BoatRegistry.load(registry_path)
+    if registry is None or registry.source != source or not registry.is_current(boats_json_path):
+        if registry is not None and registry.source == source and registry.same_contents(boats_json_path):
+            # Same contents under a new modification time: only the recorded stat changes
+            stat = os.stat(boats_json_path)
+            registry.size, registry.mtime_ns = stat.st_size, stat.st_mtime_ns
+        else:
+            registry = BoatRegistry.build(boats_json_path)
+            if registry.size < 0:
+                return registry  # malformed: reported, nothing worth keeping
+        try:
+            registry.save(registry_path)
+        except OSError:
+            pass  # read-only directory: the registry still serves this run
+    _registries[source] = registry
+    return registry
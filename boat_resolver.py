@@ -0,0 +1,218 @@
+"""
+Boat name resolver for PPYC Wednesday Night Racing chat parsing.
+
+Built once from boats.json, it answers "which boat is this phrase?" through
+three prebuilt indexes, tried in order:
+
+1. exact alias lookup (``boat_aliases``)
+2. substring rules (``substring_aliases``) matched with an Aho-Corasick
+   automaton, so every rule is checked in one pass over the phrase
+3. bounded edit-distance lookup against the alias keys through a BK-tree
+
+Resolved phrases are memoized in an LRU cache.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+# Fuzzy matches allow one edit, and only in phrases of FUZZY_MIN_LENGTH or more:
+# "dog" is one edit away from too many ordinary words, and with two edits
+# "go dog go" would be go hogs go. The boat found must also be a clear winner:
+# no other boat within FUZZY_MARGIN more edits.
+FUZZY_MIN_LENGTH = 5
+FUZZY_MAX_DISTANCE = 1
+FUZZY_MARGIN = 1
+RESOLVE_CACHE_SIZE = 4096
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance between a and b, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SubstringAutomaton:
+    """Aho-Corasick automaton reporting which patterns occur in a text"""
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[Set[int]] = [set()]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(set())
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.output[state].add(index)
+
+        # Breadth-first pass to wire failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.output[nxt] |= self.output[self.fail[nxt]]
+
+    def find(self, text: str) -> Set[int]:
+        """Indexes of all patterns that occur in text"""
+        found: Set[int] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            found |= self.output[state]
+        return found
+
+    def to_data(self) -> Dict:
+        """JSON-serializable tables, for from_data"""
+        return {'patterns': self.patterns, 'goto': self.goto, 'fail': self.fail,
+                'output': [sorted(out) for out in self.output]}
+
+    @classmethod
+    def from_data(cls, data: Dict) -> 'SubstringAutomaton':
+        """An automaton from to_data() tables, without rebuilding it"""
+        automaton = cls.__new__(cls)
+        automaton.patterns = data['patterns']
+        automaton.goto = data['goto']
+        automaton.fail = data['fail']
+        automaton.output = [set(out) for out in data['output']]
+        return automaton
+
+
+class BKTree:
+    """Burkhard-Keller tree over strings for bounded edit-distance queries"""
+
+    def __init__(self, words: List[str]):
+        self.root: Optional[Tuple[str, Dict[int, tuple]]] = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str):
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while True:
+            distance = edit_distance(word, node[0], len(word) + len(node[0]))
+            if distance == 0:
+                return
+            if distance not in node[1]:
+                node[1][distance] = (word, {})
+                return
+            node = node[1][distance]
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[int, str]]:
+        """All (distance, word) pairs within max_distance of word"""
+        if self.root is None:
+            return []
+        matches = []
+        stack = [self.root]
+        while stack:
+            candidate, children = stack.pop()
+            distance = edit_distance(word, candidate, len(word) + len(candidate))
+            if distance <= max_distance:
+                matches.append((distance, candidate))
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return matches
+
+    def to_data(self) -> Optional[list]:
+        """The tree as nested [word, [[distance, child], ...]] lists, for from_data"""
+        def node_data(node):
+            return [node[0], [[distance, node_data(child)] for distance, child in node[1].items()]]
+        return node_data(self.root) if self.root is not None else None
+
+    @classmethod
+    def from_data(cls, data: Optional[list]) -> 'BKTree':
+        """A tree from to_data() lists, without recomputing any distances"""
+        def node(item):
+            return item[0], {distance: node(child) for distance, child in item[1]}
+        tree = cls([])
+        tree.root = node(data) if data is not None else None
+        return tree
+
+
+class BoatResolver:
+    """Resolve lowercased, whitespace-normalized phrases to canonical boat names"""
+
+    def __init__(self, boat_aliases: Dict[str, str], substring_aliases: List[Dict],
+                 cache_size: int = RESOLVE_CACHE_SIZE):
+        self.boat_aliases = boat_aliases
+        # Each rule: {"boat": canonical, "contains": [substrings that must all occur]}
+        self.rules = [(rule['boat'], list(rule['contains'])) for rule in substring_aliases]
+        patterns = sorted({s for _, contains in self.rules for s in contains})
+        pattern_index = {p: i for i, p in enumerate(patterns)}
+        self.rule_patterns = [frozenset(pattern_index[s] for s in contains) for _, contains in self.rules]
+        self.automaton = SubstringAutomaton(patterns)
+        self.fuzzy_index = BKTree(sorted(boat_aliases))
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def to_data(self) -> Dict:
+        """The rules and prebuilt indexes as JSON-serializable data, for from_data"""
+        return {'rules': self.rules, 'rule_patterns': [sorted(needed) for needed in self.rule_patterns],
+                'automaton': self.automaton.to_data(), 'fuzzy_index': self.fuzzy_index.to_data()}
+
+    @classmethod
+    def from_data(cls, boat_aliases: Dict[str, str], data: Dict,
+                  cache_size: int = RESOLVE_CACHE_SIZE) -> 'BoatResolver':
+        """A resolver from to_data() output, skipping the automaton and BK-tree construction"""
+        resolver = cls.__new__(cls)
+        resolver.boat_aliases = boat_aliases
+        resolver.rules = [(boat, list(contains)) for boat, contains in data['rules']]
+        resolver.rule_patterns = [frozenset(needed) for needed in data['rule_patterns']]
+        resolver.automaton = SubstringAutomaton.from_data(data['automaton'])
+        resolver.fuzzy_index = BKTree.from_data(data['fuzzy_index'])
+        resolver.resolve = lru_cache(maxsize=cache_size)(resolver._resolve)
+        return resolver
+
+    def _resolve(self, phrase: str) -> Tuple[Optional[str], Optional[str]]:
+        """Return (canonical boat, how) with how in exact/substring/fuzzy, or (None, None)"""
+        if phrase in self.boat_aliases:
+            return self.boat_aliases[phrase], 'exact'
+
+        # Earliest rule (boats.json order) whose substrings all occur wins
+        found = self.automaton.find(phrase)
+        if found:
+            for (boat, _), needed in zip(self.rules, self.rule_patterns):
+                if needed <= found:
+                    return boat, 'substring'
+
+        boat = self._fuzzy(phrase)
+        if boat:
+            return boat, 'fuzzy'
+        return None, None
+
+    def _fuzzy(self, phrase: str) -> Optional[str]:
+        """Closest alias within FUZZY_MAX_DISTANCE edits, if its boat is the only one
+        within FUZZY_MARGIN edits more"""
+        if len(phrase) < FUZZY_MIN_LENGTH:
+            return None
+        matches = self.fuzzy_index.search(phrase, FUZZY_MAX_DISTANCE + FUZZY_MARGIN)
+        if not matches:
+            return None
+        best = min(distance for distance, _ in matches)
+        if best > FUZZY_MAX_DISTANCE:
+            return None
+        boats = {self.boat_aliases[alias] for distance, alias in matches if distance <= best + FUZZY_MARGIN}
+        return boats.pop() if len(boats) == 1 else None
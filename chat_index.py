@@ -0,0 +1,140 @@
+"""
+Byte-offset index of the Wednesday weeks in a WhatsApp chat export.
+
+A week runs from the first message dated on a Wednesday up to the first
+message of the next Wednesday (or the end of the export), the same segments
+split_chat_by_wednesday.py writes. The index maps each Wednesday date to that
+byte range and a hash of its bytes. It is built from a memory-mapped scan that
+only decodes message headers, saved next to the export, and reused while the
+export's size and modification time are unchanged, so a single week can be
+read by seeking straight to its range.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import tempfile
+from collections import namedtuple
+from datetime import datetime
+from typing import Dict, Optional
+
+from timestamps import decode_timestamp
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.index.json'
+
+# Invisible Unicode characters (zero-width, RTL/LTR marks and embeddings) that
+# WhatsApp sprinkles into exports and that would otherwise break matching
+INVISIBLE_CHARS_RE = re.compile(r'[\u200b-\u200f\u202a-\u202e\u2060-\u206f]')
+# [M/D/YY, H:MM:SS AM/PM] at the start of a line
+DATE_PATTERN = re.compile(r'^\[(\d{1,2}/\d{1,2}/\d{2}), (\d{1,2}:\d{2}:\d{2}\s*[AP]M)\]')
+# Candidate header lines: a '[' at the start of a line, after any blanks and
+# U+2000-U+207F characters (UTF-8 e2 80/81 xx), which covers the invisible marks
+LINE_START_RE = re.compile(rb'(?:\A|(?<=[\r\n]))[ \t]*(?:\xe2[\x80\x81][\x80-\xbf][ \t]*)*\[')
+# Longest header prefix decoded per candidate line
+HEADER_BYTES = 64
+
+WeekSpan = namedtuple('WeekSpan', ['date', 'start', 'end', 'sha256'])
+
+
+def parse_timestamp(line: str) -> Optional[datetime]:
+    """Timestamp of a message header line, or None for continuation lines"""
+    m = DATE_PATTERN.match(line)
+    if not m:
+        return None
+    try:
+        return decode_timestamp(*m.groups())
+    except ValueError:
+        return None
+
+
+def index_path_for(chat_path: str) -> str:
+    """Where the index of a chat export is kept"""
+    return chat_path + INDEX_SUFFIX
+
+
+class WeekIndex:
+    """Wednesday date -> WeekSpan for one chat export"""
+
+    def __init__(self, source: str, size: int, mtime_ns: int, weeks: Dict[str, WeekSpan]):
+        self.source = source
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.weeks = weeks
+
+    @classmethod
+    def build(cls, chat_path: str) -> 'WeekIndex':
+        """Scan a chat export for Wednesday segment boundaries"""
+        stat = os.stat(chat_path)
+        starts = []  # (date, byte offset of its first message)
+        if stat.st_size:
+            with open(chat_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                current = None
+                for match in LINE_START_RE.finditer(mm):
+                    pos = match.start()
+                    header = mm[pos:match.end() + HEADER_BYTES].split(b'\n', 1)[0].split(b'\r', 1)[0]
+                    # Headers are recognized as the parser sees them: stripped, marks removed
+                    dt = parse_timestamp(INVISIBLE_CHARS_RE.sub('', header.decode('utf-8', 'ignore').strip()))
+                    if dt and dt.weekday() == 2 and dt.date() != current:
+                        current = dt.date()
+                        starts.append((dt.strftime('%Y-%m-%d'), pos))
+                weeks: Dict[str, WeekSpan] = {}
+                for k, (date, start) in enumerate(starts):
+                    end = starts[k + 1][1] if k + 1 < len(starts) else stat.st_size
+                    # A date seen twice (out-of-order export) keeps its last segment
+                    weeks.pop(date, None)
+                    weeks[date] = WeekSpan(date, start, end, hashlib.sha256(mm[start:end]).hexdigest())
+        else:
+            weeks = {}
+        return cls(os.path.abspath(chat_path), stat.st_size, stat.st_mtime_ns, weeks)
+
+    @classmethod
+    def load(cls, index_path: str) -> Optional['WeekIndex']:
+        """A saved index, or None if missing or unreadable"""
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != INDEX_VERSION:
+                return None
+            weeks = {w['date']: WeekSpan(w['date'], w['start'], w['end'], w['sha256']) for w in data['weeks']}
+            return cls(data['source'], data['size'], data['mtime_ns'], weeks)
+        except (FileNotFoundError, KeyError, TypeError, json.JSONDecodeError):
+            return None
+
+    def save(self, index_path: str):
+        """Write the index atomically (temp file + rename)"""
+        data = {
+            'version': INDEX_VERSION,
+            'source': self.source,
+            'size': self.size,
+            'mtime_ns': self.mtime_ns,
+            'weeks': [w._asdict() for w in self.weeks.values()]
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(index_path)), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def is_current(self, chat_path: str) -> bool:
+        """True while the export has the size and modification time it was indexed at"""
+        try:
+            stat = os.stat(chat_path)
+        except FileNotFoundError:
+            return False
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+
+def load_week_index(chat_path: str, index_path: Optional[str] = None) -> WeekIndex:
+    """The saved index of a chat export if still current, else a fresh (and saved) one"""
+    index_path = index_path or index_path_for(chat_path)
+    index = WeekIndex.load(index_path)
+    if index is None or not index.is_current(chat_path):
+        index = WeekIndex.build(chat_path)
+        index.save(index_path)
+    return index
@@ -0,0 +1,88 @@
+"""
+Claim evidence that refers to chat messages by ID.
+
+A processed week cites each message once, in ``week['messages']``:
+{id: {'author', 'timestamp', 'text'}}, where the ID is the message's index
+among that Wednesday's messages (as a string, the way JSON keys come back).
+Claims in 'evidence' and in the ambiguity's 'dropped_claims' name their
+message with 'message'; a claim about one sentence of a longer message
+adds 'sentence', that sentence's index in SENTENCE_SPLIT_RE.split(text).
+
+This table form is how weeks are held in memory and, by default, written
+(results.json, the per-week files, results streams). Readers look a claim's
+message up when they need it (claim_message, claim_text); expand_evidence()
+gives the inline form, with text, author and timestamp copied into every
+claim, for --evidence inline and for readers that want each claim whole.
+"""
+
+import re
+from typing import Dict, Iterable, List, Sequence
+
+# Evidence layouts of written results: claims referring into a per-week table (default), or carrying their message
+EVIDENCE_FORMATS = ('table', 'inline')
+TIMESTAMP_FORMAT = "%Y-%m-%d %I:%M %p"
+# Sentence boundaries of a message, as ahead/behind claims are scoped
+SENTENCE_SPLIT_RE = re.compile(r'[.!?]')
+
+
+def cited_messages(messages: Sequence, claims: Iterable[Dict]) -> Dict[str, Dict]:
+    """The table of the messages ``claims`` cite, in chat order"""
+    table = {}
+    for message_id in sorted({claim['message'] for claim in claims}, key=int):
+        msg = messages[int(message_id)]
+        table[message_id] = {'author': msg.author, 'timestamp': msg.timestamp.strftime(TIMESTAMP_FORMAT),
+                             'text': msg.text}
+    return table
+
+
+def claim_message(week: Dict, claim: Dict) -> Dict:
+    """The message a claim of ``week`` cites (inline claims are their own message)"""
+    if 'message' not in claim:
+        return claim
+    return week['messages'][claim['message']]
+
+
+def claim_text(message: Dict, claim: Dict) -> str:
+    """The text a claim quotes from its message"""
+    if 'sentence' in claim:
+        return SENTENCE_SPLIT_RE.split(message['text'])[claim['sentence']].strip()
+    return message['text']
+
+
+def expand_claim(claim: Dict, messages: Dict[str, Dict]) -> Dict:
+    """``claim`` with its message's text, author and timestamp in place of the reference"""
+    if 'message' not in claim:
+        return claim
+    message = messages[claim['message']]
+    expanded = {}
+    for key, value in claim.items():
+        if key == 'message':
+            expanded['text'] = claim_text(message, claim)
+            expanded['author'] = message['author']
+            expanded['timestamp'] = message['timestamp']
+        elif key != 'sentence':
+            expanded[key] = value
+    return expanded
+
+
+def expand_claims(claims: List[Dict], messages: Dict[str, Dict]) -> List[Dict]:
+    return [expand_claim(claim, messages) for claim in claims]
+
+
+def expand_evidence(week: Dict) -> Dict:
+    """A copy of ``week`` with inline evidence and no message table (``week`` itself if already inline)"""
+    if week is None or 'messages' not in week:
+        return week
+    messages = week['messages']
+    expanded = {key: value for key, value in week.items() if key != 'messages'}
+    expanded['evidence'] = expand_claims(week['evidence'], messages)
+    ambiguity = week.get('ambiguity')
+    if isinstance(ambiguity, dict) and 'dropped_claims' in ambiguity:
+        expanded['ambiguity'] = dict(ambiguity, dropped_claims=expand_claims(ambiguity['dropped_claims'], messages))
+    return expanded
+
+
+def expand_results(results: Dict) -> Dict:
+    """A copy of a ``{"series": ...}`` results dict with every week's evidence inline"""
+    series = dict(results['series'], weeks=[expand_evidence(week) for week in results['series']['weeks']])
+    return dict(results, series=series)
@@ -3,14 +3,180 @@
 Generate final results table for WNR 2025 series.
 Creates a final_results.md file with a table where each row is a boat 
 and each column is a week's race.
-Reads data from per-week markdown files in results/ directory.
+Reads data from the per-week JSON files in results/ directory (falling back
+to the per-week markdown for weeks without JSON), or from a columnar season
+file or a results stream written by parse_chat.py.
 """
 
+import argparse
+import json
 import os
 import re
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from json.decoder import scanstring
+
+from results_stream import iter_results_stream
+
+# Identifies the columnar season file written by parse_chat.write_season_columns
+SEASON_COLUMNS_FORMAT = 'wnr-season-columns/1'
+WEEK_FILE_RE = re.compile(r'(\d{4}-\d{2}-\d{2})\.(json|md)$')
+# Top-level tokens of a per-week JSON document, with the whitespace around them
+JSON_OBJECT_START_RE = re.compile(r'[ \t\n\r]*\{[ \t\n\r]*')
+JSON_NAME_SEPARATOR_RE = re.compile(r'[ \t\n\r]*:[ \t\n\r]*')
+JSON_VALUE_SEPARATOR_RE = re.compile(r'[ \t\n\r]*([,}])[ \t\n\r]*')
+JSON_DECODER = json.JSONDecoder()
+
+
+def load_results(results_dir: str = 'results', season_path: Optional[str] = None,
+                 stream_path: Optional[str] = None) -> Tuple[Dict, str]:
+    """Load race results, returning (results_data, description of the source).
+
+    A columnar season file or results stream is used when given; otherwise each
+    week is read from results/YYYY-MM-DD.json, or from its markdown when no JSON
+    exists."""
+    if stream_path:
+        results_data = load_results_from_stream(stream_path)
+        return results_data, f"results stream {stream_path}"
+    if season_path:
+        results_data = load_results_from_season_columns(season_path)
+        return results_data, f"columnar season file {season_path}"
+    results_data, json_weeks = load_results_from_json_files(results_dir)
+    if json_weeks == len(results_data):
+        return results_data, f"{len(results_data)} per-week JSON files in {results_dir}/ directory"
+    return results_data, f"{len(results_data)} per-week JSON/markdown files in {results_dir}/ directory"
+
+
+def load_results_from_json_files(results_dir: str = 'results') -> Tuple[Dict, int]:
+    """Load race results from per-week JSON files, parsing the markdown only for
+    weeks that have no JSON. Returns (results_data, weeks read from JSON)."""
+    files: Dict[str, Dict[str, str]] = {}
+    for name in os.listdir(results_dir):
+        match = WEEK_FILE_RE.match(name)
+        if match:
+            files.setdefault(match.group(1), {})[match.group(2)] = name
+
+    results_data = {}
+    json_weeks = 0
+    for date in sorted(files):
+        kinds = files[date]
+        name = kinds.get('json', kinds.get('md'))
+        filepath = os.path.join(results_dir, name)
+        try:
+            if 'json' in kinds:
+                race_results = parse_json_results(filepath, date)
+            else:
+                race_results = parse_markdown_results(filepath, date)
+            if race_results:
+                results_data[date] = race_results
+                json_weeks += 'json' in kinds
+        except Exception as e:
+            print(f"Warning: Could not parse {name}: {e}")
+
+    return results_data, json_weeks
+
+
+def parse_json_results(filepath: str, date: str) -> Optional[Dict]:
+    """Read the scored results of a single per-week JSON file."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        week = decode_week_through_results(f.read())
+    return week_results(week, date)
+
+
+def decode_week_through_results(text: str) -> Dict:
+    """The top-level members of a per-week JSON document up to and including 'results'.
+
+    Members are decoded one at a time and decoding stops at 'results', so the
+    evidence and messages written after it are never built (nor checked). A
+    week without 'results' (only 'results_provisional') is decoded whole."""
+    match = JSON_OBJECT_START_RE.match(text)
+    if not match:
+        raise json.JSONDecodeError("Expecting a week object", text, 0)
+    week = {}
+    pos = match.end()
+    if text.startswith('}', pos):
+        return week
+    while True:
+        if not text.startswith('"', pos):
+            raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, pos)
+        key, pos = scanstring(text, pos + 1)
+        match = JSON_NAME_SEPARATOR_RE.match(text, pos)
+        if not match:
+            raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+        week[key], pos = JSON_DECODER.raw_decode(text, match.end())
+        if key == 'results':
+            return week
+        match = JSON_VALUE_SEPARATOR_RE.match(text, pos)
+        if not match:
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+        if match.group(1) == '}':
+            return week
+        pos = match.end()
+
+
+def week_results(week: Dict, date: str) -> Optional[Dict]:
+    """The scored results of one week as parse_chat.py writes it"""
+    key = 'results' if 'results' in week else 'results_provisional'
+
+    results = []
+    for r in week.get(key, []):
+        score = r.get('score')
+        # Same rows the markdown summary yields: a boat with a numeric score
+        if not r.get('boat') or isinstance(score, bool) or not isinstance(score, (int, float)):
+            continue
+        range_value = r.get('range', '')
+        if isinstance(range_value, list):
+            range_value = f"{range_value[0]}–{range_value[1]}"
+        results.append({
+            'boat': r['boat'],
+            'pos': r.get('pos'),
+            'range': range_value,
+            'novices': r.get('novices') or 0,
+            'status': r.get('status', 'FIN'),
+            'score': score
+        })
+
+    return {
+        'date': date,
+        'results': results
+    } if results else None
+
+
+def load_results_from_season_columns(season_path: str) -> Dict:
+    """Load race results from a columnar season file (one list per field)."""
+    with open(season_path, 'r', encoding='utf-8') as f:
+        season = json.load(f)
+    if season.get('format') != SEASON_COLUMNS_FORMAT:
+        raise ValueError(f"{season_path} is not a {SEASON_COLUMNS_FORMAT} season file")
+
+    dates = season['dates']
+    columns = season['columns']
+    results_data = {date: {'date': date, 'results': []} for date in dates}
+    for d, boat, pos, novices, status, score in zip(columns['date'], columns['boat'], columns['pos'],
+                                                    columns['novices'], columns['status'], columns['score']):
+        results_data[dates[d]]['results'].append({
+            'boat': boat,
+            'pos': pos,
+            'novices': novices,
+            'status': status,
+            'score': score
+        })
+    return {date: race for date, race in results_data.items() if race['results']}
+
+
+def load_results_from_stream(stream_path: str) -> Dict:
+    """Load race results from a results stream, one week line at a time
+    (evidence and the rest of each week are dropped as soon as it is read)."""
+    results_data = {}
+    for kind, value in iter_results_stream(stream_path):
+        if kind == 'week':
+            race_results = week_results(value, value['date'])
+            if race_results:
+                results_data[value['date']] = race_results
+    return results_data
+
 
 def load_results_from_markdown_files(results_dir: str = 'results') -> Dict:
     """Load race results from per-week markdown files."""
@@ -97,65 +263,69 @@ def parse_markdown_results(filepath: str, date: str) -> Optional[Dict]:
         'results': results
     } if results else None
 
-def create_results_table(results_data: Dict) -> pd.DataFrame:
-    """Create a DataFrame with boats as rows and race weeks as columns."""
-    
-    # Get all boats and race dates
-    all_boats = set()
-    race_dates = sorted(results_data.keys())
-    
-    # Collect all boat names from all races and normalize case
-    boat_name_mapping = {}  # Maps lowercase to proper case name
-    for race_data in results_data.values():
-        for result in race_data['results']:
-            boat_name = result['boat']
-            boat_lower = boat_name.lower()
-            
-            # Use the first occurrence as the canonical name, or prefer proper case
-            if boat_lower not in boat_name_mapping:
-                boat_name_mapping[boat_lower] = boat_name
-            else:
-                # If we have a version with proper capitalization, prefer it
-                existing = boat_name_mapping[boat_lower]
-                if boat_name != existing:
-                    # Choose the one with more capitals (better formatting)
-                    if sum(1 for c in boat_name if c.isupper()) > sum(1 for c in existing if c.isupper()):
-                        boat_name_mapping[boat_lower] = boat_name
-    
-    all_boats = sorted(boat_name_mapping.values())
-    
-    # Create a DataFrame with boats as index and race dates as columns
-    df = pd.DataFrame(index=all_boats, columns=race_dates)
-    
-    # Fill in the scores for each boat in each race
+def collect_result_records(results_data: Dict) -> pd.DataFrame:
+    """One long-form row per result: date, boat (canonical spelling), pos, status,
+    score, display value and numeric points."""
+    columns = {'date': [], 'boat': [], 'pos': [], 'status': [], 'score': []}
     for date, race_data in results_data.items():
         for result in race_data['results']:
-            # Normalize boat name to canonical version
-            boat_lower = result['boat'].lower()
-            canonical_boat = boat_name_mapping[boat_lower]
-            
-            pos = result.get('pos')
-            score = result.get('score', '')
-            status = result.get('status', 'FIN')
-            
-            # Format the display value
-            if status == 'DNC':
-                df.loc[canonical_boat, date] = f"DNC({score})"
-            elif status == 'DSQ':
-                df.loc[canonical_boat, date] = f"DSQ({score})"
-            elif status == 'DNF':
-                df.loc[canonical_boat, date] = f"DNF({score})"
-            elif pos is not None:
-                df.loc[canonical_boat, date] = f"{pos}({score})"
-            else:
-                df.loc[canonical_boat, date] = str(score) if score != '' else 'DNC'
-    
-    # Fill NaN values with 'DNC' for races where boat didn't participate
-    df = df.fillna('DNC')
-    
-    return df
+            columns['date'].append(date)
+            columns['boat'].append(result['boat'])
+            columns['pos'].append(result.get('pos'))
+            columns['status'].append(result.get('status', 'FIN'))
+            columns['score'].append(result.get('score', ''))
+    records = pd.DataFrame({name: pd.Series(values, dtype=object) for name, values in columns.items()})
+    if records.empty:
+        records['display'] = pd.Series(dtype=object)
+        records['points'] = pd.Series(dtype=float)
+        return records
+
+    # Canonical spelling per lowercase name: the first one with the most capitals
+    # (counted once per distinct spelling, not per result)
+    capitals = {name: sum(1 for c in name if c.isupper()) for name in records['boat'].unique()}
+    boat_key = records['boat'].str.lower()
+    first_best = records['boat'].map(capitals).astype(int).groupby(boat_key, sort=False).idxmax()
+    records['boat'] = boat_key.map(records['boat'][first_best].set_axis(first_best.index))
+
+    # Display value: Status(Score) for DNC/DSQ/DNF, else Position(Score), else the bare score
+    score_text = records['score'].astype(str)
+    bare = np.where(records['score'] == '', 'DNC', score_text)
+    display = np.where(records['pos'].isna(), bare, records['pos'].astype(str) + '(' + score_text + ')')
+    penalized = records['status'].isin(['DNC', 'DSQ', 'DNF'])
+    records['display'] = pd.Series(np.where(penalized, records['status'] + '(' + score_text + ')', display),
+                                   index=records.index, dtype=object)
+    records['points'] = pd.to_numeric(records['score'], errors='coerce').astype(float)
+    return records
+
+
+def build_season_tables(results_data: Dict) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Boats x race dates tables from one pivot of the long-form records:
+    display strings (missing races shown as DNC) and a float score matrix
+    (missing races = NaN) kept apart from them for arithmetic."""
+    race_dates = sorted(results_data.keys())
+    # A boat reported twice in one race keeps its last result
+    records = collect_result_records(results_data).drop_duplicates(['boat', 'date'], keep='last')
+    all_boats = sorted(records['boat'].unique())
+
+    # Pivot by scattering each record into its (boat, date) cell
+    rows = pd.Index(all_boats).get_indexer(records['boat'])
+    cols = pd.Index(race_dates).get_indexer(records['date'])
+    display = np.full((len(all_boats), len(race_dates)), 'DNC', dtype=object)
+    display[rows, cols] = records['display'].to_numpy(dtype=object)
+    points = np.full(display.shape, np.nan)
+    points[rows, cols] = records['points'].to_numpy(dtype=float)
+
+    df = pd.DataFrame(display, index=all_boats, columns=race_dates, dtype=object)
+    scores = pd.DataFrame(points, index=all_boats, columns=race_dates)
+    return df, scores
 
-def generate_markdown_table(df: pd.DataFrame, results_data: Dict) -> str:
+
+def create_results_table(results_data: Dict) -> pd.DataFrame:
+    """Create a DataFrame with boats as rows and race weeks as columns."""
+    return build_season_tables(results_data)[0]
+
+
+def generate_markdown_table(df: pd.DataFrame, results_data: Dict, source: str = "") -> str:
     """Generate markdown table from DataFrame."""
     
     lines = []
@@ -189,17 +359,12 @@ def generate_markdown_table(df: pd.DataFrame, results_data: Dict) -> str:
     lines.append(separator)
     
     # Data rows
-    for boat in df.index:
+    for boat, values in zip(df.index, df.to_numpy()):
         # Use boat name as-is from markdown files (proper capitalization)
-        row = f"| {boat} |"
-        
-        for col in df.columns:
-            value = df.loc[boat, col]
-            row += f" {value} |"
-        
-        lines.append(row)
+        lines.append(f"| {boat} |" + "".join(f" {value} |" for value in values))
     
     lines.append("")
+
     lines.append("## Legend")
     lines.append("")
     lines.append("- **Position(Score)**: Finish position with points scored")
@@ -217,18 +382,27 @@ def generate_markdown_table(df: pd.DataFrame, results_data: Dict) -> str:
     lines.append("- **Throwouts**: 1 worst per 4 races (series rule)")
     lines.append("")
     
-    lines.append(f"Generated from {len(results_data)} per-week markdown files in results/ directory.")
+    source = source or f"{len(results_data)} per-week markdown files in results/ directory"
+    lines.append(f"Generated from {source}.")
     lines.append("")
     
     return "\n".join(lines)
 
 def main():
     """Main function to generate final results."""
-    print("Loading results from per-week markdown files...")
-    results_data = load_results_from_markdown_files()
+    arg_parser = argparse.ArgumentParser(description="Generate the WNR season table from per-week results")
+    arg_parser.add_argument('--results-dir', default='results', help="directory of per-week results (default: results)")
+    arg_parser.add_argument('--season', metavar='PATH',
+                            help="read a columnar season file from parse_chat.py (e.g. season_columns.json) instead")
+    arg_parser.add_argument('--stream', metavar='PATH',
+                            help="read a results stream from parse_chat.py --stream (newline-delimited JSON) instead")
+    args = arg_parser.parse_args()
+
+    print("Loading results...")
+    results_data, source = load_results(args.results_dir, args.season, args.stream)
     
     if not results_data:
-        print("Error: No results data found in markdown files")
+        print("Error: No results data found")
         return
     
     print(f"Found {len(results_data)} race weeks")
@@ -239,7 +413,7 @@ def main():
     print(f"Generated table with {len(df)} boats and {len(df.columns)} races")
     
     print("Generating markdown...")
-    markdown = generate_markdown_table(df, results_data)
+    markdown = generate_markdown_table(df, results_data, source)
     
     # Write markdown file
     output_file_md = 'final_results.md'
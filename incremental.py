@@ -0,0 +1,183 @@
+"""
+Incremental re-scoring of a growing chat export.
+
+IncrementalResults keeps an EnhancedChatParser and each week's processed
+result in memory. Lines appended to the export are parsed on their own, only
+the Wednesdays they fall on are re-processed, and the series is re-folded
+(DNC scores, standings) from the earliest of those weeks forward. An edit to
+boats.json re-processes only the weeks that looked up a boat name or had an
+author whose resolution changed.
+
+watch() drives it for ``parse_chat.py --watch``, rewriting results.json,
+season_columns.json and the per-week files of the re-folded weeks only.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from boat_registry import load_boat_registry
+from output_writer import OutputWriter
+from parse_chat import EnhancedChatParser, write_results_json, write_season_columns
+
+# Seconds between checks of the export and boats.json for changes
+POLL_INTERVAL = 1.0
+
+
+def _file_state(path: str) -> Optional[Tuple[int, int]]:
+    """(size, mtime_ns) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class IncrementalResults:
+    """Series results for one export, kept current as it grows or boats.json changes"""
+
+    def __init__(self, chat_file_path: str, boats_json_path: str = 'boats.json', expected_scores: bool = False,
+                 cache_dir: Optional[str] = None, jobs: int = 1):
+        self.chat_file_path = chat_file_path
+        self.boats_json_path = boats_json_path
+        self.expected_scores = expected_scores
+        self.cache_dir = cache_dir  # week cache and worker processes for full (re)builds
+        self.jobs = jobs
+        self.rebuild()
+
+    def rebuild(self):
+        """Parse and score the whole export from scratch"""
+        self.parser = EnhancedChatParser(self.chat_file_path, self.boats_json_path, cache_dir=self.cache_dir,
+                                         jobs=self.jobs, expected_scores=self.expected_scores)
+        # The last message read may still get continuation lines: (store index, byte offset, date)
+        self._open_message: Optional[Tuple[int, int, str]] = None
+        self._read_messages(self._complete_lines_end(os.path.getsize(self.chat_file_path)))
+        # Weeks as processed, before the series fold adds DNC entries to them
+        self.processed: Dict[str, Dict] = {}
+        # Boat names each week looked up, to tell which weeks a boats.json edit affects
+        # (not known for weeks served from the week cache or processed in workers)
+        self.names: Dict[str, Set[str]] = {}
+        if self.parser.week_cache or self.jobs > 1:
+            self.processed.update(self.parser.process_weeks(self.parser.weekly_races))
+        else:
+            for date in self.parser.weekly_races:
+                self._process(date)
+        self.parser.refold_from(self.processed, '')
+
+    def _process(self, date: str):
+        self.parser.names_looked_up = set()
+        try:
+            self.processed[date] = self.parser.process_weekly_race(date, self.parser.weekly_races[date])
+            self.names[date] = self.parser.names_looked_up
+        finally:
+            self.parser.names_looked_up = None
+
+    def _rescore(self, dates: Set[str]) -> List[str]:
+        """Re-process ``dates`` and re-fold from the earliest; returns the re-folded dates"""
+        if not dates:
+            return []
+        for date in dates:
+            self._process(date)
+        return self.parser.refold_from(self.processed, min(dates))
+
+    def poll(self) -> List[str]:
+        """Take in lines appended to the export; returns the re-folded dates"""
+        state = _file_state(self.chat_file_path)
+        if state is None:
+            return []
+        size = state[0]
+        if size < self.parser.stream_offset:
+            # Truncated or replaced: start over
+            self.rebuild()
+            return [w['date'] for w in self.parser.series_data['weeks']]
+        end = self._complete_lines_end(size)
+        if end <= self.parser.stream_offset:
+            return []
+        return self._rescore(self._read_messages(end))
+
+    def reload_boats(self) -> List[str]:
+        """Apply an edited boats.json; returns the re-folded dates"""
+        parser = self.parser
+        all_names = set().union(*self.names.values()) if self.names else set()
+        before = {name: parser.normalize_boat_name(name) for name in all_names}
+        old_author_to_boat = parser.author_to_boat
+        old_digest = parser.boat_registry.sha256
+
+        parser.use_boat_registry(load_boat_registry(self.boats_json_path))
+        changed_names = {name for name in all_names if parser.normalize_boat_name(name) != before[name]}
+        changed_authors = {author for author in set(old_author_to_boat) | set(parser.author_to_boat)
+                           if old_author_to_boat.get(author) != parser.author_to_boat.get(author)}
+
+        affected = {date for date, names in self.names.items() if names & changed_names}
+        if parser.boat_registry.sha256 != old_digest:
+            affected |= set(parser.weekly_races) - set(self.names)  # names looked up not known
+        for date, messages in parser.weekly_races.items():
+            if date not in affected and changed_authors and any(m.author.lower() in changed_authors for m in messages):
+                affected.add(date)
+        return self._rescore(affected)
+
+    def _read_messages(self, end: int) -> Set[str]:
+        """Store the messages up to byte ``end``; returns the Wednesdays they fall on.
+
+        The previous last message is dropped and read again first, so lines
+        appended to it since (a multi-line message still arriving) are kept."""
+        parser = self.parser
+        start = parser.stream_offset
+        touched: Set[str] = set()
+        if self._open_message is not None:
+            index, start, date = self._open_message
+            parser.messages.truncate(index)
+            if date in parser.weekly_races:
+                parser.weekly_races[date].truncate(index)
+                touched.add(date)
+        for message, raw_start, raw_end in parser._iter_message_spans(start, end_offset=end):
+            parser._store_message(message, raw_start, raw_end)
+            date = message.timestamp.strftime("%Y-%m-%d")
+            self._open_message = (len(parser.messages) - 1, raw_start, date)
+            if message.timestamp.weekday() == 2:  # Wednesday
+                touched.add(date)
+        return touched
+
+    def _complete_lines_end(self, size: int) -> int:
+        """Offset just past the last newline, so a line still being written is left for the next poll"""
+        start = self.parser.stream_offset
+        with open(self.chat_file_path, 'rb') as f:
+            f.seek(start)
+            data = f.read(size - start)
+        return start + data.rfind(b'\n') + 1
+
+
+def _write_outputs(results: IncrementalResults, output_dir: str, dates: Optional[List[str]] = None,
+                   evidence: str = 'table'):
+    series = {'series': results.parser.series_data}
+    with OutputWriter() as writer:
+        write_results_json(series, os.path.join(output_dir, 'results.json'), writer, evidence)
+        write_season_columns(series, os.path.join(output_dir, 'season_columns.json'), writer)
+        results.parser.write_week_files(output_dir, dates, writer, evidence)
+
+
+def watch(chat_file_path: str, boats_json_path: str = 'boats.json', output_dir: str = '.',
+          interval: float = POLL_INTERVAL, expected_scores: bool = False, evidence: str = 'table',
+          cache_dir: Optional[str] = None, jobs: int = 1):
+    """Score the export, then keep re-scoring what appended lines and boats.json edits touch.
+
+    ``evidence``, ``cache_dir`` and ``jobs`` are as for a one-shot run; the cache
+    and workers serve the initial scoring (and any rebuild after truncation)."""
+    results = IncrementalResults(chat_file_path, boats_json_path, expected_scores, cache_dir, jobs)
+    _write_outputs(results, output_dir, evidence=evidence)
+    print(f"Watching {chat_file_path} and {boats_json_path}: {len(results.parser.series_data['weeks'])} race weeks written", flush=True)
+    boats_state = _file_state(boats_json_path)
+    try:
+        while True:
+            time.sleep(interval)
+            start = time.perf_counter()
+            dates: Set[str] = set()
+            if _file_state(boats_json_path) != boats_state:
+                boats_state = _file_state(boats_json_path)
+                dates.update(results.reload_boats())
+            dates.update(results.poll())
+            if dates:
+                _write_outputs(results, output_dir, sorted(dates), evidence)
+                print(f"Re-scored {', '.join(sorted(dates))} in {(time.perf_counter() - start) * 1000:.1f} ms", flush=True)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Live race-night results server.
+
+Keeps the series in memory (incremental.IncrementalResults) and tails the
+chat export: lines appended to it are parsed as they arrive, only the
+Wednesdays they fall on are re-scored, and the series is re-folded from the
+earliest of them (usually just the latest week). Every change publishes a
+new snapshot of pre-encoded JSON responses, so requests only look up bytes
+and any number of clients cost nothing extra.
+
+    GET /standings          series standings
+    GET /week               the latest race week (results, ranges, evidence)
+    GET /week/YYYY-MM-DD    one race week
+    GET /weeks              dates of the scored weeks
+
+The export stands in for the live chat feed. --replay SOURCE appends the
+lines of another export to it a few at a time, to rehearse a race night:
+
+    cp _chat.txt /tmp/live.txt && truncate -s 80000 /tmp/live.txt
+    python3 live_server.py /tmp/live.txt --replay _chat.txt --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import traceback
+from typing import Dict, List, Tuple
+
+from evidence import expand_evidence
+from incremental import POLL_INTERVAL, IncrementalResults
+
+STATUS_TEXT = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed', 400: 'Bad Request'}
+
+
+def _encode(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+class LiveResults(IncrementalResults):
+    """IncrementalResults that publishes a snapshot of JSON responses after every change"""
+
+    def __init__(self, chat_file_path: str, boats_json_path: str = 'boats.json', expected_scores: bool = False):
+        self.version = 0
+        self.snapshot: Tuple[int, Dict[str, bytes]] = (0, {})  # (version, path -> response body)
+        super().__init__(chat_file_path, boats_json_path, expected_scores)
+
+    def rebuild(self):
+        super().rebuild()
+        self._week_bytes = {week['date']: _encode(expand_evidence(week)) for week in self.parser.series_data['weeks']}
+        self._publish()
+
+    def poll(self) -> List[str]:
+        """Take in lines appended to the export; returns the re-folded dates"""
+        refolded = super().poll()
+        if refolded:
+            weeks = {w['date']: w for w in self.parser.series_data['weeks']}
+            self._week_bytes = {date: body for date, body in self._week_bytes.items() if date in weeks}
+            for date in refolded:
+                self._week_bytes[date] = _encode(expand_evidence(weeks[date]))
+            self._publish()
+        return refolded
+
+    def _publish(self):
+        """Swap in freshly encoded responses (readers keep whichever snapshot they looked up)"""
+        self.version += 1
+        series = self.parser.series_data
+        dates = [w['date'] for w in series['weeks']]
+        snapshot = {f"/week/{date}": body for date, body in self._week_bytes.items()}
+        snapshot['/week'] = self._week_bytes[dates[-1]] if dates else _encode(None)
+        snapshot['/weeks'] = _encode(dates)
+        snapshot['/standings'] = _encode({'standings': series['standings'], 'boats_seen': series['boats_seen'],
+                                          'races': len(dates)})
+        self.snapshot = (self.version, snapshot)
+
+
+async def handle_client(live: LiveResults, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Serve one HTTP/1.x request from the current snapshot"""
+    try:
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+            pass  # headers are not needed
+        parts = request_line.decode('latin-1').split()
+        version, snapshot = live.snapshot
+        if len(parts) < 2:
+            status, body = 400, _encode({'error': 'bad request'})
+        elif parts[0] not in ('GET', 'HEAD'):
+            status, body = 405, _encode({'error': 'only GET is supported'})
+        else:
+            body = snapshot.get(parts[1].split('?', 1)[0].rstrip('/') or '/standings')
+            status = 200 if body is not None else 404
+            if body is None:
+                body = _encode({'error': f"no such resource: {parts[1]}"})
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"ETag: \"{version}\"\r\n"
+                f"Cache-Control: no-cache\r\n"
+                f"Connection: close\r\n\r\n").encode('latin-1')
+        writer.write(head if parts and parts[0] == 'HEAD' else head + body)
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def watch(live: LiveResults, interval: float):
+    """Poll the export for appended lines and re-score what they touch.
+
+    A failed poll is reported and tried again next interval (the last good
+    snapshot keeps being served meanwhile)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        start = time.perf_counter()
+        try:
+            touched = await loop.run_in_executor(None, live.poll)
+        except Exception:
+            print(f"Error re-scoring {live.chat_file_path} (serving version {live.version}, retrying):", flush=True)
+            traceback.print_exc()
+            continue
+        if touched:
+            print(f"Re-scored {', '.join(touched)} in {(time.perf_counter() - start) * 1000:.1f} ms (version {live.version})", flush=True)
+
+
+async def replay_feed(source: str, target: str, lines_per_tick: int, interval: float):
+    """Stand-in for the live chat: append the rest of ``source`` (of which ``target``
+    holds a prefix) to ``target`` a few lines at a time"""
+    with open(source, 'rb') as f:
+        data = f.read()
+    with open(target, 'rb') as f:
+        prefix = f.read()
+    done = len(prefix)
+    if data[:done] != prefix:
+        raise SystemExit(f"--replay: {target} is not a prefix of {source}")
+    lines = data[done:].splitlines(keepends=True)
+    for i in range(0, len(lines), lines_per_tick):
+        await asyncio.sleep(interval)
+        with open(target, 'ab') as f:
+            f.write(b''.join(lines[i:i + lines_per_tick]))
+    print(f"Replay of {source} finished")
+
+
+async def serve(args):
+    live = LiveResults(args.chat_file, args.boats, args.expected_scores)
+    print(f"Scored {len(live.parser.series_data['weeks'])} race weeks from {args.chat_file}")
+    server = await asyncio.start_server(lambda r, w: handle_client(live, r, w), args.host, args.port)
+    print(f"Serving on http://{args.host}:{args.port}/standings")
+    tasks = [asyncio.create_task(watch(live, args.interval))]
+    if args.replay:
+        tasks.append(asyncio.create_task(replay_feed(args.replay, args.chat_file, args.replay_lines, args.interval)))
+    async with server:
+        tasks.append(asyncio.create_task(server.serve_forever()))
+        # Serving only ends with a failed task: stop rather than serve a series no longer kept current
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Serve live WNR results while the chat export grows")
+    arg_parser.add_argument('chat_file', nargs='?', default='_chat.txt', help="chat export to tail (default: _chat.txt)")
+    arg_parser.add_argument('--boats', default='boats.json', help="boat alias file (default: boats.json)")
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8080)
+    arg_parser.add_argument('--interval', type=float, default=POLL_INTERVAL, help="seconds between polls of the export")
+    arg_parser.add_argument('--expected-scores', action='store_true',
+                            help="score finishers of partially ordered weeks by expected position")
+    arg_parser.add_argument('--replay', metavar='SOURCE',
+                            help="append SOURCE's remaining lines to the export over time (race-night rehearsal)")
+    arg_parser.add_argument('--replay-lines', type=int, default=5, metavar='N', help="lines appended per poll interval")
+    args = arg_parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
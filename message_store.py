@@ -0,0 +1,237 @@
+"""
+Columnar in-memory store of parsed chat messages.
+
+Instead of one namedtuple (datetime, author, text, raw_line) per message, the
+store keeps parallel arrays: epoch-second timestamps in an array('q'),
+interned author ids, and every message text in one UTF-8 buffer addressed by
+offsets. Raw lines are not kept at all; each message remembers the byte range
+it came from in the export, and its raw line is rebuilt from there on demand.
+
+Per-week message lists are MessageViews: index ranges into the store, not
+copies. Items come out as StoredMessage handles that read their fields from
+the arrays when accessed and compare equal to the equivalent Message tuple.
+A whole store saves as compressed columns (to_data) and loads back without
+re-parsing a message (from_data), which is what parse_chat.py checkpoints keep.
+"""
+
+import base64
+import sys
+import zlib
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from chat_index import INVISIBLE_CHARS_RE
+
+EPOCH = datetime(1970, 1, 1)
+# Per-message array columns of a MessageStore, as saved by to_data
+STORE_COLUMNS = ('timestamps', 'author_ids', 'text_ends', 'raw_starts', 'raw_ends')
+
+
+def _pack(data: bytes) -> str:
+    """Bytes as base64 of their zlib compression, for JSON"""
+    return base64.b64encode(zlib.compress(data, 1)).decode('ascii')
+
+
+def _unpack(text: str) -> bytes:
+    """Bytes from _pack output"""
+    try:
+        return zlib.decompress(base64.b64decode(text))
+    except zlib.error as e:
+        raise ValueError(f"corrupt packed bytes: {e}") from e
+
+
+def raw_line_from_bytes(data: bytes) -> str:
+    """A message's raw line from its bytes in the export, cleaned line by line
+    the way the parser reads them (stripped, invisible marks removed, blank lines skipped)"""
+    lines = []
+    for raw in data.split(b'\n'):
+        for piece in raw.split(b'\r'):
+            line = piece.decode('utf-8').strip()
+            if line:
+                lines.append(INVISIBLE_CHARS_RE.sub('', line))
+    return '\n'.join(lines)
+
+
+class StoredMessage:
+    """One message of a MessageStore, read field by field on access"""
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store: 'MessageStore', index: int):
+        self.store = store
+        self.index = index
+
+    @property
+    def timestamp(self) -> datetime:
+        return EPOCH + timedelta(seconds=self.store.timestamps[self.index])
+
+    @property
+    def author(self) -> str:
+        return self.store.authors[self.store.author_ids[self.index]]
+
+    @property
+    def text(self) -> str:
+        return self.store.text(self.index)
+
+    @property
+    def raw_line(self) -> Optional[str]:
+        return self.store.raw_line(self.index)
+
+    def __iter__(self):
+        # Unpacks like Message(timestamp, author, text, raw_line)
+        return iter((self.timestamp, self.author, self.text, self.raw_line))
+
+    def __eq__(self, other) -> bool:
+        return tuple(self) == tuple(other)
+
+    def __repr__(self) -> str:
+        return f"StoredMessage(timestamp={self.timestamp!r}, author={self.author!r}, text={self.text!r})"
+
+
+class MessageStore:
+    """Append-only columnar message store for one chat export"""
+
+    def __init__(self, source_path: Optional[str] = None):
+        self.source_path = source_path  # export the raw byte ranges refer to
+        self.timestamps = array('q')
+        self.author_ids = array('l')
+        self.authors: List[str] = []
+        self._author_ids: Dict[str, int] = {}
+        self.text_buffer = bytearray()
+        self.text_ends = array('q')
+        self.raw_starts = array('q')
+        self.raw_ends = array('q')
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index: int) -> StoredMessage:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("message index out of range")
+        return StoredMessage(self, index)
+
+    def __iter__(self) -> Iterator[StoredMessage]:
+        return (StoredMessage(self, i) for i in range(len(self)))
+
+    def append(self, timestamp: datetime, author: str, text: str, raw_start: int = -1, raw_end: int = -1) -> int:
+        """Add a message; returns its index"""
+        author_id = self._author_ids.get(author)
+        if author_id is None:
+            author_id = self._author_ids[author] = len(self.authors)
+            self.authors.append(author)
+        self.timestamps.append((timestamp - EPOCH) // timedelta(seconds=1))
+        self.author_ids.append(author_id)
+        self.text_buffer += text.encode('utf-8')
+        self.text_ends.append(len(self.text_buffer))
+        self.raw_starts.append(raw_start)
+        self.raw_ends.append(raw_end)
+        return len(self.timestamps) - 1
+
+    def truncate(self, length: int):
+        """Drop every message from index ``length`` on (e.g. one to be re-read with more lines)"""
+        self.text_buffer[self.text_ends[length - 1] if length else 0:] = b''
+        for column in (self.timestamps, self.author_ids, self.text_ends, self.raw_starts, self.raw_ends):
+            del column[length:]
+
+    def text(self, index: int) -> str:
+        start = self.text_ends[index - 1] if index else 0
+        return self.text_buffer[start:self.text_ends[index]].decode('utf-8')
+
+    def raw_line(self, index: int) -> Optional[str]:
+        """The message's lines as in the export (rebuilt from the source file), or None if unknown"""
+        start, end = self.raw_starts[index], self.raw_ends[index]
+        if start < 0 or not self.source_path:
+            return None
+        with open(self.source_path, 'rb') as f:
+            f.seek(start)
+            return raw_line_from_bytes(f.read(end - start))
+
+    def subset(self, ranges: Sequence[Tuple[int, int]]) -> 'MessageStore':
+        """A new store holding only the messages in ``ranges`` (for shipping a week to a worker)"""
+        part = MessageStore(self.source_path)
+        for start, stop in ranges:
+            for i in range(start, stop):
+                message = StoredMessage(self, i)
+                part.append(message.timestamp, message.author, message.text, self.raw_starts[i], self.raw_ends[i])
+        return part
+
+    def to_data(self) -> Dict:
+        """JSON-serializable columns, for from_data: the authors, and the text buffer
+        and each array column packed as compressed bytes"""
+        data = {'authors': self.authors, 'text': _pack(bytes(self.text_buffer))}
+        for name in STORE_COLUMNS:
+            column = getattr(self, name)
+            data[name] = {'itemsize': column.itemsize, 'bytes': _pack(column.tobytes())}
+        return data
+
+    @classmethod
+    def from_data(cls, data: Dict, source_path: Optional[str] = None) -> 'MessageStore':
+        """A store from to_data() columns, without rebuilding a single message"""
+        store = cls(source_path)
+        store.authors = list(data['authors'])
+        store._author_ids = {author: i for i, author in enumerate(store.authors)}
+        store.text_buffer = bytearray(_unpack(data['text']))
+        for name in STORE_COLUMNS:
+            column = getattr(store, name)
+            if data[name]['itemsize'] != column.itemsize:
+                raise ValueError(f"{name} saved with {data[name]['itemsize']}-byte items, not {column.itemsize}")
+            column.frombytes(_unpack(data[name]['bytes']))
+        if len({len(getattr(store, name)) for name in STORE_COLUMNS}) != 1:
+            raise ValueError("message columns of different lengths")
+        if (store.text_ends[-1] if store.text_ends else 0) != len(store.text_buffer):
+            raise ValueError("message texts do not fill the text buffer")
+        return store
+
+    def memory_usage(self) -> Dict[str, float]:
+        """Bytes held by the store's buffers, in total and per message"""
+        size = sum(sys.getsizeof(a) for a in (self.timestamps, self.author_ids, self.text_ends,
+                                                self.raw_starts, self.raw_ends, self.text_buffer))
+        size += sys.getsizeof(self.authors) + sum(sys.getsizeof(a) for a in self.authors)
+        count = len(self)
+        return {'messages': count, 'bytes': size, 'bytes_per_message': size / count if count else 0.0}
+
+
+class MessageView:
+    """Sequence of messages of a MessageStore given as index ranges (no copies)"""
+
+    def __init__(self, store: MessageStore, ranges: Optional[List[List[int]]] = None):
+        self.store = store
+        self.ranges: List[List[int]] = ranges if ranges is not None else []  # [start, stop) pairs
+
+    def add(self, index: int):
+        """Append store message ``index``, extending the last range when contiguous"""
+        if self.ranges and self.ranges[-1][1] == index:
+            self.ranges[-1][1] += 1
+        else:
+            self.ranges.append([index, index + 1])
+
+    def truncate(self, length: int):
+        """Drop store indexes from ``length`` on, as MessageStore.truncate does"""
+        self.ranges = [[start, min(stop, length)] for start, stop in self.ranges if start < length]
+
+    def __len__(self) -> int:
+        return sum(stop - start for start, stop in self.ranges)
+
+    def __iter__(self) -> Iterator[StoredMessage]:
+        for start, stop in self.ranges:
+            for i in range(start, stop):
+                yield StoredMessage(self.store, i)
+
+    def __getitem__(self, k: int) -> StoredMessage:
+        if k < 0:
+            k += len(self)
+        for start, stop in self.ranges:
+            if k < stop - start:
+                return StoredMessage(self.store, start + k)
+            k -= stop - start
+        raise IndexError("message index out of range")
+
+    def __eq__(self, other) -> bool:
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __reduce__(self):
+        # Pickle just this view's messages, e.g. for a worker process
+        part = self.store.subset(self.ranges)
+        return MessageView, (part, [[0, len(part)]])
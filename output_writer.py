@@ -0,0 +1,101 @@
+"""
+Skip-unchanged, atomic output files.
+
+Artifacts are rendered in memory and handed to an OutputWriter. On flush, each
+one is compared with the file on disk (size first, then a SHA-256 of the
+bytes) and only files whose content changed are written: to a temp file in
+the same directory, then renamed over the target, so readers never see a
+partial file. Checks and writes run on a small thread pool. A run whose
+outputs are all unchanged writes nothing.
+"""
+
+import hashlib
+import os
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Union
+
+# Threads used to check and write output files
+WRITER_THREADS = 4
+# Permissions of newly created output files
+NEW_FILE_MODE = 0o644
+
+
+def atomic_write_bytes(path: str, data: bytes):
+    """Write ``data`` to ``path`` via a temp file and rename"""
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = NEW_FILE_MODE
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, mode)  # mkstemp files are private; keep the target's permissions (no fchmod on Windows)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def same_content(path: str, data: bytes) -> bool:
+    """True if ``path`` exists and holds exactly ``data``"""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).digest() == hashlib.sha256(data).digest()
+    except FileNotFoundError:
+        return False
+
+
+def write_if_changed(path: str, data: bytes) -> bool:
+    """Atomically write ``data`` unless ``path`` already holds it; returns whether it wrote"""
+    if same_content(path, data):
+        return False
+    atomic_write_bytes(path, data)
+    return True
+
+
+class OutputWriter:
+    """Collects rendered output files and writes the changed ones on flush"""
+
+    def __init__(self, threads: int = WRITER_THREADS):
+        self.threads = threads
+        self._pending: Dict[str, bytes] = {}
+        self.written: List[str] = []
+        self.unchanged = 0
+
+    def add(self, path: str, content: Union[str, bytes]):
+        """Queue ``content`` (str is UTF-8 encoded) for ``path``; a later add replaces an earlier one"""
+        self._pending[path] = content.encode('utf-8') if isinstance(content, str) else content
+
+    def flush(self):
+        """Write every queued file whose content differs from disk"""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        for directory in {os.path.dirname(os.path.abspath(path)) for path in pending}:
+            os.makedirs(directory, exist_ok=True)
+        paths = list(pending)
+        if len(paths) == 1 or self.threads <= 1:
+            changed = [write_if_changed(path, pending[path]) for path in paths]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.threads, len(paths))) as pool:
+                changed = list(pool.map(write_if_changed, paths, [pending[path] for path in paths]))
+        for path, wrote in zip(paths, changed):
+            if wrote:
+                self.written.append(path)
+            else:
+                self.unchanged += 1
+
+    def summary(self) -> str:
+        return f"{len(self.written)} written, {self.unchanged} unchanged"
+
+    def __enter__(self) -> 'OutputWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
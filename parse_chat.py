@@ -8,34 +8,101 @@ Follows specifications in .github/instructions/chat-instructions.md
 
 import re
 import json
+import hashlib
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional, Set, Iterable
-from collections import defaultdict, namedtuple, deque
+from typing import Dict, List, Tuple, Optional, Set, Iterable, Iterator
+from collections import defaultdict, namedtuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import argparse
+import contextlib
+import copy
+import itertools
 import os
-import sys
+import time
+
+from boat_registry import BoatRegistry, load_boat_registry
+from chat_index import INVISIBLE_CHARS_RE, load_week_index
+from claim_graph import ClaimGraph, CycleError, minimum_feedback_arc_set
+from evidence import EVIDENCE_FORMATS, SENTENCE_SPLIT_RE, cited_messages, claim_message, claim_text, expand_evidence, expand_results
+from linear_extensions import position_distribution
+from message_store import MessageStore, MessageView
+from output_writer import OutputWriter, atomic_write_bytes
+from profiling import StageProfiler
+from results_db import ResultsDatabase
+from results_stream import ResultsStreamWriter
+from timestamps import decode_timestamp
+from standings import SeriesStandings, finish_score
+from week_cache import WeekCache, week_key
 
 # Message structure
 Message = namedtuple('Message', ['timestamp', 'author', 'text', 'raw_line'])
 
-def load_boat_mappings(boats_json_path: str = 'boats.json') -> Tuple[Dict[str, str], Dict[str, str]]:
-    """Load boat aliases and author-to-boat mappings from JSON file"""
-    try:
-        with open(boats_json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data['boat_aliases'], data['author_to_boat']
-    except FileNotFoundError:
-        print(f"Warning: {boats_json_path} not found. Using empty mappings.")
-        return {}, {}
-    except (KeyError, json.JSONDecodeError) as e:
-        print(f"Error loading {boats_json_path}: {e}")
-        return {}, {}
+# Format: [M/D/YY, H:MM:SS AM/PM] Author: Message
+# Handle Unicode spaces between time and AM/PM
+MESSAGE_LINE_RE = re.compile(r'^\[(\d{1,2}/\d{1,2}/\d{2}), (\d{1,2}:\d{2}:\d{2}[\s\u00A0\u202F\u2009\u2007\u2008][AP]M)\] ([^:]+): (.*)$')
+UNICODE_SPACES_RE = re.compile(r'[\u00A0\u202F\u2009\u2007\u2008]')
+
+# Single scanner for everything extract_individual_claims looks for after the
+# numbered-finish check: sentence stops, "X ahead" / "Y behind" keywords, novice
+# counts ("2 novices", "4nv") and DSQ/DNF markers. Run once over the lowercased text.
+CLAIM_TOKEN_RE = re.compile(
+    r'(?P<stop>[.!?])'
+    r'|\s+(?P<keyword>ahead|behind)(?=[\s.,!?]|$)'
+    r'|(?P<novices>\d+)\s*(?:novice|novices|nv|nvs)\b'
+    r'|(?P<penalty>dsq|dnf)'
+)
+FINISH_ORDER_RE = re.compile(r'(\d+)(?:st|nd|rd|th)\s+([^,]+?)(?:,|$|\s+\d+(?:st|nd|rd|th))', re.IGNORECASE)
+# Characters a boat name in an ahead/behind claim may span (plus any whitespace)
+WHITESPACE_RE = re.compile(r'\s+')
+NON_NAME_CHARS_RE = re.compile(r'[^a-zA-Z0-9\s\-]')
+BOAT_NAME_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-')
+
+# Weight of ahead/behind claims when contradictory ones must be dropped: each
+# counts 1, and the week's latest report gets up to RECENCY_CLAIM_BONUS more
+# (corrections come late)
+RECENCY_CLAIM_BONUS = 0.5
+
+# Identifies the columnar season file written by write_season_columns
+SEASON_COLUMNS_FORMAT = 'wnr-season-columns/1'
+
+# Stages recorded by attach_profiler: method -> (stage name, week of a call from its args)
+PROFILED_STAGES = {
+    'generate_results': ('generate_results', None),
+    'parse_chat_file': ('parse_chat_file', None),
+    '_consume_line': ('line_cleanup', None),
+    '_build_message': ('timestamp_parse', None),
+    'process_weekly_race': ('process_weekly_race', lambda args: args[0]),
+    'extract_individual_claims': ('extract_individual_claims', None),
+    'resolve_claim_conflicts': ('resolve_claim_conflicts', None),
+    'build_finish_order': ('build_finish_order', None),
+    '_compute_position_ranges': ('_compute_position_ranges', None),
+    'calculate_scores': ('calculate_scores', None),
+    '_apply_position_distribution': ('position_distribution', lambda args: args[0]['date']),
+    'fold_weeks': ('fold_weeks', None),
+    'stream_results': ('stream_results', None),
+    '_apply_dnc': ('_apply_dnc', lambda args: args[0].get('date')),
+    '_compute_standings': ('_compute_standings', None),
+    'write_week_files': ('write_week_files', None),
+}
+
+# Bytes read per chunk by the streaming reader
+CHUNK_SIZE = 64 * 1024
+# Bytes before the offset a database reached that are hashed to detect a replaced export
+CHECKPOINT_TAIL_BYTES = 256
 
 class EnhancedChatParser:
-    def __init__(self, chat_file_path: str, boats_json_path: str = 'boats.json'):
+    def __init__(self, chat_file_path: str, boats_json_path: str = 'boats.json', cache_dir: Optional[str] = None,
+                 jobs: int = 1, expected_scores: bool = False, db_path: Optional[str] = None,
+                 checkpoint_path: Optional[str] = None):
         self.chat_file_path = chat_file_path
-        self.boat_aliases, self.author_to_boat = load_boat_mappings(boats_json_path)
-        self.messages: List[Message] = []
-        self.weekly_races: Dict[str, List[Message]] = defaultdict(list)
+        self.checkpoint_path = checkpoint_path  # default checkpoint of parse_chat_file
+        self.jobs = jobs  # worker processes for per-week processing (1 = in-process)
+        # Score finishers of partially ordered weeks by expected position instead of the representative order
+        self.expected_scores = expected_scores
+        self.boats_json_path = boats_json_path
+        self.use_boat_registry(load_boat_registry(boats_json_path))
+        self.messages = MessageStore(chat_file_path)
+        self.weekly_races: Dict[str, MessageView] = {}  # Wednesday date -> index ranges into messages
         self.series_data = {
             "boats_seen": set(),
             "weeks": [],
@@ -49,124 +116,303 @@ class EnhancedChatParser:
             "standings": []
         }
         self._weekly_boats_seen: Set[str] = set()  # cumulative unique boats (for DNC scoring)
+        self.standings = SeriesStandings()  # incremental standings over the scored weeks
+        self.stream_offset = 0  # bytes of the export consumed by iter_messages
+        self.last_timestamp: Optional[datetime] = None  # newest message timestamp seen
+        # Per-week results cache keyed by messages + boats.json + parser version
+        self.week_cache = WeekCache(cache_dir) if cache_dir else None
+        self._boats_digest = self.boat_registry.sha256 if cache_dir else ''
+        # Optional SQLite store of messages and scored results (see results_db)
+        self.database = ResultsDatabase(db_path) if db_path else None
+        # When a set, collects every boat name looked up (see incremental.IncrementalResults)
+        self.names_looked_up: Optional[Set[str]] = None
+        self.profiler: Optional[StageProfiler] = None
+
+    def use_boat_registry(self, registry: BoatRegistry):
+        """Look boats up in ``registry`` (see boat_registry.py)"""
+        self.boat_registry = registry
+        self.boat_aliases = registry.boat_aliases
+        self.author_to_boat = registry.author_to_boat
+        self.boat_resolver = registry.resolver
+
+    def attach_profiler(self, profiler: StageProfiler):
+        """Record wall time, calls and allocations of the pipeline stages
+        (PROFILED_STAGES) in ``profiler``, per week where a stage belongs to one.
+        Weeks processed in worker processes or served from the week cache are not seen."""
+        self.profiler = profiler
+        profiler.instrument(self, PROFILED_STAGES)
         
-    def parse_chat_file(self):
-        """Parse the WhatsApp chat export file"""
-        with open(self.chat_file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
+    def parse_chat_file(self, checkpoint_path: Optional[str] = None):
+        """Parse the WhatsApp chat export file.
+
+        With a checkpoint path (or the parser's own), the messages saved by the
+        previous run are loaded instead of re-parsed and parsing resumes where
+        that run stopped, so only messages appended since are parsed. The last
+        saved message is read again, keeping lines appended to it since. The
+        checkpoint is updated afterwards.
+
+        With a database, the messages it holds for this export are loaded
+        instead of re-parsed, and only messages appended since are parsed and
+        upserted into it."""
+        checkpoint_path = checkpoint_path or self.checkpoint_path
+        if self.database:
+            start_offset = self._load_database_messages()
+        else:
+            start_offset = self.load_checkpoint(checkpoint_path) if checkpoint_path else 0
+        new_rows = []
+        for message, raw_start, raw_end in self._iter_message_spans(start_offset):
+            self._store_message(message, raw_start, raw_end)
+            if self.database:
+                new_rows.append((raw_start, raw_end, message.timestamp.isoformat(), message.author, message.text))
+        if self.database:
+            self.database.add_messages(os.path.abspath(self.chat_file_path), new_rows, self.stream_offset,
+                                       self._tail_digest(self.stream_offset),
+                                       self.last_timestamp.isoformat() if self.last_timestamp else None)
+        if checkpoint_path:
+            self.save_checkpoint(checkpoint_path)
+
+    def _load_database_messages(self) -> int:
+        """Store the database's messages for this export; returns the byte offset
+        to resume parsing from (0, with the stored messages dropped, if the export
+        changed before that offset)"""
+        source = os.path.abspath(self.chat_file_path)
+        state = self.database.source_state(source)
+        if state is None:
+            return 0
+        offset = state['offset']
+        if offset > os.path.getsize(self.chat_file_path) or state['tail_sha1'] != self._tail_digest(offset):
+            print(f"Warning: {self.chat_file_path} changed since it was stored in {self.database.path}; parsing from the start")
+            self.database.reset_source(source)
+            return 0
+        for raw_start, raw_end, timestamp, author, text in self.database.iter_messages(source):
+            self._store_message(Message(datetime.fromisoformat(timestamp), author, text, None), raw_start, raw_end)
+        if state['last_timestamp']:
+            self.last_timestamp = datetime.fromisoformat(state['last_timestamp'])
+        return offset
+
+    def iter_messages(self, start_offset: int = 0, chunk_size: int = CHUNK_SIZE,
+                      end_offset: Optional[int] = None) -> Iterator[Message]:
+        """Stream messages from the chat export starting at a byte offset.
+
+        The file is read in binary chunks and each Message is yielded as soon as
+        the next message header (or end of file, or ``end_offset``) shows it is complete.
+        ``self.stream_offset`` and ``self.last_timestamp`` track the bytes consumed
+        and the newest message seen, for use by ``save_checkpoint``."""
+        for message, _, _ in self._iter_message_spans(start_offset, chunk_size, end_offset):
+            yield message
+
+    def _iter_message_spans(self, start_offset: int = 0, chunk_size: int = CHUNK_SIZE,
+                            end_offset: Optional[int] = None) -> Iterator[Tuple[Message, int, int]]:
+        """iter_messages, with the byte range [start, end) each message spans in the export"""
+        self.stream_offset = start_offset
         current_message = None
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Remove invisible Unicode characters that might interfere
-            line = re.sub(r'[\u200b-\u200f\u202a-\u202e\u2060-\u206f]', '', line)
-            line = re.sub(r'[‎‏]', '', line)  # Remove specific RTL/LTR markers
-            
-            # Check if this is a new message line
-            # Format: [M/D/YY, H:MM:SS AM/PM] Author: Message
-            # Handle Unicode spaces between time and AM/PM
-            message_pattern = r'^\[(\d{1,2}/\d{1,2}/\d{2}), (\d{1,2}:\d{2}:\d{2}[\s\u00A0\u202F\u2009\u2007\u2008][AP]M)\] ([^:]+): (.*)$'
-            match = re.match(message_pattern, line)
-            
-            if match:
-                # Save previous message if exists
-                if current_message:
-                    self._add_message(current_message)
-                
-                # Start new message
-                date_str, time_str, author, text = match.groups()
-                current_message = {
-                    'date_str': date_str,
-                    'time_str': time_str,
-                    'author': author.strip(),
-                    'text': text.strip(),
-                    'raw_line': line
-                }
-            else:
-                # This is a continuation of the previous message
-                if current_message:
-                    current_message['text'] += ' ' + line
-                    current_message['raw_line'] += '\n' + line
-        
+        with open(self.chat_file_path, 'rb') as f:
+            f.seek(start_offset)
+            remaining = end_offset - start_offset if end_offset is not None else None
+            pending = b''
+            while True:
+                if remaining is None:
+                    chunk = f.read(chunk_size)
+                else:
+                    chunk = f.read(min(chunk_size, remaining))
+                    remaining -= len(chunk)
+                if chunk:
+                    pending += chunk
+                    *complete, pending = pending.split(b'\n')
+                    consumed = sum(len(raw) + 1 for raw in complete)
+                else:
+                    # End of file: an unterminated last line is still a line
+                    complete, pending = ([pending] if pending else []), b''
+                    consumed = sum(len(raw) for raw in complete)
+                line_start = self.stream_offset
+                for raw in complete:
+                    for piece in raw.split(b'\r'):
+                        line_end = line_start + len(piece)
+                        message, current_message = self._consume_line(piece.decode('utf-8'), current_message,
+                                                                      line_start, line_end)
+                        if message:
+                            yield message
+                        line_start = line_end + 1
+                self.stream_offset += consumed
+                if not chunk:
+                    break
+
         # Don't forget the last message
         if current_message:
-            self._add_message(current_message)
-    
-    def _add_message(self, msg_data):
-        """Add a parsed message to the messages list"""
+            message = self._build_message(current_message)
+            if message:
+                yield message, current_message['start'], current_message['end']
+
+    def load_week(self, date: str) -> List[Message]:
+        """Messages of one race Wednesday (YYYY-MM-DD), read by seeking to its byte
+        range in the export's week index instead of scanning the whole export"""
+        span = load_week_index(self.chat_file_path).weeks.get(date)
+        if span is None:
+            return []
+        return [m for m in self.iter_messages(span.start, end_offset=span.end)
+                if m.timestamp.weekday() == 2 and m.timestamp.strftime("%Y-%m-%d") == date]
+
+    def _consume_line(self, line: str, current_message: Optional[Dict], start: int = 0,
+                      end: int = 0) -> Tuple[Optional[Tuple[Message, int, int]], Optional[Dict]]:
+        """Feed one physical line (bytes [start, end) of the export); return
+        ((completed message, its start, its end) or None, message in progress)"""
+        line = line.strip()
+        if not line:
+            return None, current_message
+
+        # Remove invisible Unicode characters that might interfere
+        line = INVISIBLE_CHARS_RE.sub('', line)
+
+        # Check if this is a new message line
+        match = MESSAGE_LINE_RE.match(line)
+        if match:
+            # Previous message is complete once a new one starts
+            completed = self._build_message(current_message) if current_message else None
+            if completed:
+                completed = (completed, current_message['start'], current_message['end'])
+            date_str, time_str, author, text = match.groups()
+            return completed, {
+                'date_str': date_str,
+                'time_str': time_str,
+                'author': author.strip(),
+                'text': text.strip(),
+                'raw_line': line,
+                'start': start,
+                'end': end
+            }
+
+        # This is a continuation of the previous message
+        if current_message:
+            current_message['text'] += ' ' + line
+            current_message['raw_line'] += '\n' + line
+            current_message['end'] = end
+        return None, current_message
+
+    def _build_message(self, msg_data) -> Optional[Message]:
+        """Turn raw header/continuation data into a Message, or None if the timestamp is bad"""
         try:
-            # Parse timestamp - handle narrow no-break space and other Unicode spaces
-            dt_str = f"{msg_data['date_str']}, {msg_data['time_str']}"
-            # Replace various Unicode spaces with regular space
-            dt_str = re.sub(r'[\u00A0\u202F\u2009\u2007\u2008]', ' ', dt_str)
-            timestamp = datetime.strptime(dt_str, "%m/%d/%y, %I:%M:%S %p")
-            
-            # Create message object
-            message = Message(
-                timestamp=timestamp,
-                author=msg_data['author'],
-                text=msg_data['text'],
-                raw_line=msg_data['raw_line']
-            )
-            
-            self.messages.append(message)
-            
-            # Group by Wednesday dates
-            if timestamp.weekday() == 2:  # Wednesday is 2
-                date_key = timestamp.strftime("%Y-%m-%d")
-                self.weekly_races[date_key].append(message)
-                
+            # The space before AM/PM may be a narrow no-break or other Unicode space
+            timestamp = decode_timestamp(msg_data['date_str'], msg_data['time_str'])
         except ValueError as e:
+            dt_str = UNICODE_SPACES_RE.sub(' ', f"{msg_data['date_str']}, {msg_data['time_str']}")
             print(f"Error parsing timestamp: {dt_str} - {e}")
-            return
+            return None
+
+        self.last_timestamp = timestamp
+        return Message(
+            timestamp=timestamp,
+            author=msg_data['author'],
+            text=msg_data['text'],
+            raw_line=msg_data['raw_line']
+        )
+
+    def _store_message(self, message: Message, raw_start: int = -1, raw_end: int = -1):
+        """Keep a message in the columnar store and group it by Wednesday date"""
+        index = self.messages.append(message.timestamp, message.author, message.text, raw_start, raw_end)
+        if message.timestamp.weekday() == 2:  # Wednesday is 2
+            date_key = message.timestamp.strftime("%Y-%m-%d")
+            if date_key not in self.weekly_races:
+                self.weekly_races[date_key] = MessageView(self.messages)
+            self.weekly_races[date_key].add(index)
+
+    # ------------------------------ Checkpoints ------------------------------
+    def _tail_digest(self, offset: int) -> str:
+        """Hash the bytes just before ``offset`` so a replaced export is detected"""
+        start = max(0, offset - CHECKPOINT_TAIL_BYTES)
+        with open(self.chat_file_path, 'rb') as f:
+            f.seek(start)
+            return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+    def _prefix_digest(self, offset: int) -> str:
+        """Hash the export's first ``offset`` bytes, everything a checkpoint's messages came from"""
+        digest = hashlib.sha256()
+        with open(self.chat_file_path, 'rb') as f:
+            remaining = offset
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                remaining -= len(chunk)
+        return digest.hexdigest()
+
+    def load_checkpoint(self, checkpoint_path: str) -> int:
+        """Restore the message store and weeks saved in a checkpoint, minus the last
+        message, and return that message's byte offset to resume from (it may have
+        gained lines since), or 0 if the checkpoint is missing or the export changed
+        before the offset it reached"""
+        try:
+            with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            offset = int(checkpoint['offset'])
+            store = MessageStore.from_data(checkpoint['messages'], self.chat_file_path)
+            weeks = checkpoint['weeks']
+        except FileNotFoundError:
+            return 0
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Warning: ignoring unreadable checkpoint {checkpoint_path}: {e}")
+            return 0
+        if (offset > os.path.getsize(self.chat_file_path)
+                or checkpoint.get('prefix_sha256') != self._prefix_digest(offset)):
+            print(f"Warning: {self.chat_file_path} changed before the checkpoint; parsing from the start")
+            return 0
+        if not len(store):
+            return 0
+        resume_offset = store.raw_starts[-1]
+        store.truncate(len(store) - 1)
+        self.messages = store
+        for date, ranges in weeks.items():
+            view = MessageView(store, ranges)
+            view.truncate(len(store))
+            if view.ranges:
+                self.weekly_races[date] = view
+        if checkpoint.get('last_timestamp'):
+            self.last_timestamp = datetime.fromisoformat(checkpoint['last_timestamp'])
+        return resume_offset
+
+    def save_checkpoint(self, checkpoint_path: str):
+        """Record the message store and its weeks, and the byte offset and newest
+        timestamp reached by ``iter_messages``"""
+        checkpoint = {
+            'chat_file': self.chat_file_path,
+            'offset': self.stream_offset,
+            'last_timestamp': self.last_timestamp.isoformat() if self.last_timestamp else None,
+            'prefix_sha256': self._prefix_digest(self.stream_offset),
+            'weeks': {date: view.ranges for date, view in self.weekly_races.items()},
+            'messages': self.messages.to_data()
+        }
+        atomic_write_bytes(checkpoint_path, json.dumps(checkpoint, ensure_ascii=False).encode('utf-8'))
     
     def normalize_boat_name(self, boat_name: str) -> Tuple[str, List[str]]:
         """Normalize boat name using alias mapping, return (normalized, aliases_used)"""
         if not boat_name:
             return "", []
+        if self.names_looked_up is not None:
+            self.names_looked_up.add(boat_name)
             
         original = boat_name.lower().strip()
         
         # Handle common misspellings and variations
-        original = re.sub(r'\s+', ' ', original)  # Normalize whitespace
+        original = WHITESPACE_RE.sub(' ', original)  # Normalize whitespace
         
-        # Check for aliases
-        if original in self.boat_aliases:
-            normalized = self.boat_aliases[original]
+        # Exact alias, substring rule or close misspelling (see boat_resolver)
+        normalized, how = self.boat_resolver.resolve(original)
+        if how == 'exact':
             aliases_used = [boat_name] if boat_name.lower() != normalized else []
             return normalized, aliases_used
-        
-        # Check for partial matches for boats with common misspellings
-        if 'psyco' in original or 'psycho' in original:
-            return 'psycho killer', [boat_name]
-        elif 'danger' in original and 'zone' in original:
-            return 'danger zone', [boat_name] if original != 'danger zone' else []
-        elif 'go hogs' in original or 'gohogs' in original or (original == 'hogs' and 'go' not in original):
-            return 'go hogs go', [boat_name] if original != 'go hogs go' else []
-        elif 'fast fred' in original or original == 'fred':
-            return 'fred', [boat_name] if original != 'fred' else []
-        elif 'sweet virginia' in original:
-            return 'sweet virginia', [boat_name] if original != 'sweet virginia' else []
-        elif original == 'max' or 'caper' in original:
-            return 'caper', [boat_name] if original != 'caper' else []
-        elif 'dawg' in original or original == 'dog':
-            return 'scalded dawg', [boat_name] if original != 'scalded dawg' else []
-        elif 'dandelion' in original:
-            return 'dandelion', [boat_name] if original != 'dandelion' else []
+        if how == 'fuzzy':
+            return normalized, [f"{boat_name} (fuzzy)"]
+        if normalized:
+            return normalized, [boat_name] if original != normalized else []
         
         # Return original if no alias found, but clean it up
-        cleaned = re.sub(r'[^a-zA-Z0-9\s\-]', '', original).strip()
+        cleaned = NON_NAME_CHARS_RE.sub('', original).strip()
         return cleaned if cleaned else original.lower(), []
     
     def extract_complete_finish_order(self, text: str) -> Optional[List[str]]:
         """Extract complete finish order from messages like '1st X, 2nd Y, 3rd Z...'"""
         # Pattern for numbered finish positions
-        pattern = r'(\d+)(?:st|nd|rd|th)\s+([^,]+?)(?:,|$|\s+\d+(?:st|nd|rd|th))'
-        matches = re.findall(pattern, text, re.IGNORECASE)
+        matches = FINISH_ORDER_RE.findall(text)
         
         if len(matches) >= 3:  # At least 3 boats for a valid finish order
             finish_order = []
@@ -182,14 +428,30 @@ class EnhancedChatParser:
         
         return None
     
+    @staticmethod
+    def _claim_name_start(text_lower: str, keyword_start: int, sentence_start: int) -> int:
+        """Index where the boat name before an ahead/behind keyword begins.
+
+        The name is the run of letters, digits, hyphens and whitespace leading up
+        to the keyword, ignoring whitespace at the start of the sentence."""
+        i = keyword_start
+        while i > sentence_start and (text_lower[i - 1] in BOAT_NAME_CHARS or text_lower[i - 1].isspace()):
+            i -= 1
+        if i == sentence_start:
+            while i < keyword_start and text_lower[i].isspace():
+                i += 1
+        return i
+
     def extract_individual_claims(self, messages: List[Message]) -> List[Dict]:
-        """Extract individual ahead/behind claims from messages"""
+        """Extract individual ahead/behind claims from messages.
+
+        Each message is lowercased once and walked once by CLAIM_TOKEN_RE; per
+        sentence the first "X ahead" and first "Y behind" are kept, then the first
+        novice count and any DSQ/DNF marker for the message. Claims cite their
+        message by its index in ``messages`` (see evidence.py)."""
         claims = []
         
-        for msg in messages:
-            text = msg.text
-            text_lower = text.lower()
-            
+        for index, msg in enumerate(messages):
             # Skip system messages and non-race messages during race time
             if msg.author == 'Wednesday Night Racing':
                 continue
@@ -198,96 +460,101 @@ class EnhancedChatParser:
             if msg.timestamp.hour < 19:  # Before 7 PM
                 continue
             
+            text = msg.text
+            message_id = str(index)
+
             # Look for numbered finish order first
             complete_order = self.extract_complete_finish_order(text)
             if complete_order:
                 claims.append({
                     'type': 'complete_finish_order',
                     'finish_order': complete_order,
-                    'text': text,
-                    'author': msg.author,
-                    'timestamp': msg.timestamp.strftime("%Y-%m-%d %I:%M %p")
+                    'message': message_id
                 })
                 continue
             
-            # Look for simple finish reports like "Ambush ahead. Fast Freddy behind."
-            # Pattern: "X ahead" followed by "Y behind" in same message or nearby
-            sentences = re.split(r'[.!?]', text)
-            
-            author_boat = self.author_to_boat.get(msg.author.lower(), None)
-            
-            for sentence in sentences:
-                sentence = sentence.strip()
-                if not sentence:
-                    continue
-                
-                sentence_lower = sentence.lower()
-                
-                # Pattern: "X ahead" - X is ahead of the reporting boat
-                ahead_match = re.search(r'([a-zA-Z0-9\s\-]+?)\s+ahead(?:\s|$|[.,])', sentence_lower)
-                if ahead_match and author_boat:
-                    boat_name = ahead_match.group(1).strip()
-                    normalized_boat, aliases = self.normalize_boat_name(boat_name)
-                    if normalized_boat and len(normalized_boat) > 1:
-                        claims.append({
-                            'type': 'relative_position',
-                            'boat_ahead': normalized_boat,
-                            'boat_behind': author_boat,
-                            'text': sentence,
-                            'author': msg.author,
-                            'timestamp': msg.timestamp.strftime("%Y-%m-%d %I:%M %p"),
-                            'aliases_used': aliases
-                        })
-                
-                # Pattern: "X behind" - X is behind the reporting boat
-                behind_match = re.search(r'([a-zA-Z0-9\s\-]+?)\s+behind(?:\s|$|[.,])', sentence_lower)
-                if behind_match and author_boat:
-                    boat_name = behind_match.group(1).strip()
-                    normalized_boat, aliases = self.normalize_boat_name(boat_name)
+            author_boat = self.boat_registry.boat_for_author(msg.author)
+            text_lower = text.lower()
+            sentences = None  # original-case sentences, split only if a claim needs one
+
+            # Per sentence: first valid "X ahead" (X is ahead of the reporting boat)
+            # and first valid "Y behind" (Y is behind the reporting boat)
+            sentence_index = 0
+            sentence_start = 0
+            firsts: Dict[str, str] = {}
+            novice_count = None
+            penalties: Set[str] = set()
+
+            def flush_sentence():
+                nonlocal sentences
+                for keyword in ('ahead', 'behind'):
+                    if keyword not in firsts:
+                        continue
+                    normalized_boat, aliases = self.normalize_boat_name(firsts[keyword])
                     if normalized_boat and len(normalized_boat) > 1:
-                        claims.append({
+                        if sentences is None:
+                            sentences = SENTENCE_SPLIT_RE.split(text)
+                        ahead, behind = (normalized_boat, author_boat) if keyword == 'ahead' else (author_boat, normalized_boat)
+                        claim = {
                             'type': 'relative_position',
-                            'boat_ahead': author_boat,
-                            'boat_behind': normalized_boat,
-                            'text': sentence,
-                            'author': msg.author,
-                            'timestamp': msg.timestamp.strftime("%Y-%m-%d %I:%M %p"),
-                            'aliases_used': aliases
-                        })
+                            'boat_ahead': ahead,
+                            'boat_behind': behind,
+                            'message': message_id,
+                        }
+                        if sentences[sentence_index].strip() != text:
+                            claim['sentence'] = sentence_index
+                        claim['aliases_used'] = aliases
+                        claims.append(claim)
+                firsts.clear()
+
+            for token in CLAIM_TOKEN_RE.finditer(text_lower):
+                kind = token.lastgroup
+                if kind == 'stop':
+                    flush_sentence()
+                    sentence_index += 1
+                    sentence_start = token.end()
+                elif kind == 'keyword':
+                    keyword = token.group('keyword')
+                    if not author_boat or keyword in firsts:
+                        continue
+                    keyword_start = token.start('keyword')
+                    name_start = self._claim_name_start(text_lower, keyword_start, sentence_start)
+                    if keyword_start - name_start >= 2:  # at least one name char plus whitespace
+                        firsts[keyword] = text_lower[name_start:keyword_start].strip()
+                elif kind == 'novices':
+                    if novice_count is None:
+                        novice_count = int(token.group('novices'))
+                else:
+                    penalties.add(token.group('penalty'))
+            flush_sentence()
             
             # Look for novice mentions with numbers
             # Expanded novice patterns:  "2 novices", "2 nv", "(2 novices)" "4nv"
-            novice_pattern = r'(\d+)\s*(?:novice|novices|nv|nvs)\b'
-            novice_matches = re.findall(novice_pattern, text_lower)
-            
-            if novice_matches:
-                boat = self.author_to_boat.get(msg.author.lower(), 'UNKNOWN')
+            if novice_count is not None:
+                boat = author_boat if author_boat is not None else 'UNKNOWN'
                 claims.append({
                     'type': 'novice',
                     'boat': boat,
-                    'count': int(novice_matches[0]),
-                    'text': text,
-                    'author': msg.author,
-                    'timestamp': msg.timestamp.strftime("%Y-%m-%d %I:%M %p")
+                    'count': novice_count,
+                    'message': message_id
                 })
             
             # Look for DSQ/DNF mentions
-            if 'dsq' in text_lower or 'dnf' in text_lower:
-                penalty_type = 'DSQ' if 'dsq' in text_lower else 'DNF'
-                boat = self.author_to_boat.get(msg.author.lower(), 'UNKNOWN')
+            if penalties:
+                penalty_type = 'DSQ' if 'dsq' in penalties else 'DNF'
+                boat = author_boat if author_boat is not None else 'UNKNOWN'
                 claims.append({
                     'type': 'penalty',
                     'boat': boat,
                     'penalty_type': penalty_type,
-                    'text': text,
-                    'author': msg.author,
-                    'timestamp': msg.timestamp.strftime("%Y-%m-%d %I:%M %p")
+                    'message': message_id
                 })
         
         return claims
     
-    def build_finish_order(self, claims: List[Dict]) -> Tuple[List[str], Optional[str]]:
-        """Build finish order from claims, return (order, ambiguity_note)"""
+    def build_finish_order(self, claims: List[Dict], messages: List[Message],
+                           graph: Optional[ClaimGraph] = None) -> Tuple[List[str], Optional[str]]:
+        """Build finish order from claims (citing the week's ``messages``), return (order, ambiguity_note)"""
         
         # First check if we have a complete finish order
         for claim in claims:
@@ -295,92 +562,85 @@ class EnhancedChatParser:
                 return claim['finish_order'], None
         
         # Build from relative positions
-        boats = set()
-        edges = []  # (ahead_boat, behind_boat) pairs
-        
-        for claim in claims:
-            if claim['type'] == 'relative_position':
-                ahead = claim['boat_ahead']
-                behind = claim['boat_behind']
-                boats.add(ahead)
-                boats.add(behind)
-                edges.append((ahead, behind))
-        
-        if not boats:
+        if graph is None:
+            graph = self._build_claim_graph(claims)
+        if not graph.nodes:
             return [], "No finish order data found"
         
         # Simple topological sort to determine order
         try:
-            finish_order = self._topological_sort(boats, edges)
+            finish_order = self._topological_sort(graph)
             return finish_order, None
-        except Exception as e:
-            return list(boats), f"Ambiguous finish order: {str(e)}"
+        except CycleError as e:
+            graph, dropped = self.resolve_claim_conflicts(claims, messages)
+            return self._topological_sort(graph), f"Ambiguous finish order: {str(e)}; dropped {len(dropped)} contradicting claim(s)"
     
-    def _topological_sort(self, boats: Set[str], edges: List[Tuple[str, str]]) -> List[str]:
+    def _relative_claims(self, claims: List[Dict]) -> Tuple[List[Dict], List[str]]:
+        """The ahead/behind claims between two different boats, and the boats of
+        claims that resolved to one boat on both sides (those carry no order)"""
+        relative = []
+        self_claimed = []
+        for c in claims:
+            if c.get('type') != 'relative_position':
+                continue
+            if c['boat_ahead'] == c['boat_behind']:
+                self_claimed.append(c['boat_ahead'])
+            else:
+                relative.append(c)
+        return relative, self_claimed
+
+    def _build_claim_graph(self, claims: List[Dict]) -> ClaimGraph:
+        """One graph of (ahead_boat, behind_boat) edges per week, shared by ordering and ranges"""
+        relative, self_claimed = self._relative_claims(claims)
+        return ClaimGraph(((c['boat_ahead'], c['boat_behind']) for c in relative), nodes=self_claimed)
+
+    def resolve_claim_conflicts(self, claims: List[Dict], messages: List[Message]) -> Tuple[ClaimGraph, List[Dict]]:
+        """Drop the lightest set of contradicting ahead/behind claims that makes the week acyclic.
+
+        A claim weighs 1 plus up to RECENCY_CLAIM_BONUS by the rank of its message's
+        time among the claims' messages. Each distinct (ahead, behind) edge weighs
+        the sum, over the authors asserting it, of that author's strongest claim
+        for it, so corroboration by several boats counts but one author repeating
+        themselves does not. Returns the acyclic graph of the remaining claims and
+        the dropped claims (each with its 'weight'), in chat order. ``messages`` is
+        the week's message list the claims' ids index."""
+        relative, self_claimed = self._relative_claims(claims)
+        cited = [messages[int(c['message'])] for c in relative]
+        rank = {t: k for k, t in enumerate(sorted({m.timestamp for m in cited}))}
+        span = max(len(rank) - 1, 1)
+
+        by_author: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(dict)
+        claim_weights = []
+        for c, m in zip(relative, cited):
+            weight = 1 + RECENCY_CLAIM_BONUS * rank[m.timestamp] / span
+            claim_weights.append(weight)
+            authors = by_author[(c['boat_ahead'], c['boat_behind'])]
+            authors[m.author] = max(authors.get(m.author, 0.0), weight)
+        edge_weights = {edge: sum(authors.values()) for edge, authors in by_author.items()}
+
+        dropped_edges = minimum_feedback_arc_set(edge_weights)
+        kept = []
+        dropped = []
+        for c, weight in zip(relative, claim_weights):
+            edge = (c['boat_ahead'], c['boat_behind'])
+            if edge in dropped_edges:
+                dropped.append(dict(c, weight=round(weight, 3)))
+            else:
+                kept.append(edge)
+        # Boats named only in dropped claims still started
+        boats = [b for c in relative for b in (c['boat_ahead'], c['boat_behind'])] + self_claimed
+        return ClaimGraph(kept, nodes=boats), dropped
+
+    def _topological_sort(self, graph: ClaimGraph) -> List[str]:
         """Perform topological sort on the boat positions.
         If multiple valid orders exist, one valid order is returned; ranges will later
         capture ambiguity."""
-        graph = defaultdict(list)
-        in_degree = defaultdict(int)
-        for b in boats:
-            in_degree[b] = 0
-        for a, b in edges:
-            graph[a].append(b)
-            in_degree[b] += 1
-        queue = deque(sorted([b for b in boats if in_degree[b] == 0]))  # deterministic
-        order = []
-        while queue:
-            b = queue.popleft()
-            order.append(b)
-            for n in graph[b]:
-                in_degree[n] -= 1
-                if in_degree[n] == 0:
-                    queue.append(n)
-        if len(order) != len(boats):
-            raise Exception("Circular dependency in finish order")
-        return order
-
-    def _compute_position_ranges(self, boats: Iterable[str], edges: List[Tuple[str, str]]) -> Dict[str, Tuple[int, int]]:
+        return graph.topological_order()
+
+    def _compute_position_ranges(self, boats: Iterable[str], graph: ClaimGraph) -> Dict[str, Tuple[int, int]]:
         """Given a (possibly) partially ordered set of boats (edges a->b means a ahead b),
         compute possible position range [min,max] for each boat (1-indexed)."""
-        boats = list(boats)
-        n = len(boats)
-        graph_fwd = defaultdict(set)
-        graph_rev = defaultdict(set)
-        for a, b in edges:
-            graph_fwd[a].add(b)
-            graph_rev[b].add(a)
-
-        def ancestors(b: str) -> Set[str]:
-            seen = set()
-            stack = [b]
-            while stack:
-                cur = stack.pop()
-                for p in graph_rev[cur]:
-                    if p not in seen:
-                        seen.add(p)
-                        stack.append(p)
-            return seen
-
-        def descendants(b: str) -> Set[str]:
-            seen = set()
-            stack = [b]
-            while stack:
-                cur = stack.pop()
-                for c in graph_fwd[cur]:
-                    if c not in seen:
-                        seen.add(c)
-                        stack.append(c)
-            return seen
-
-        ranges = {}
-        for b in boats:
-            anc = ancestors(b)
-            desc = descendants(b)
-            min_pos = len(anc) + 1
-            max_pos = n - len(desc)
-            ranges[b] = (min_pos, max_pos)
-        return ranges
+        return graph.position_ranges(boats)
     
     def is_valid_boat_name(self, boat_name: str) -> bool:
         """Check if a boat name is valid (not a parsing artifact)"""
@@ -431,11 +691,7 @@ class EnhancedChatParser:
             status = penalties.get(boat, 'FIN')
             
             # Calculate score based on rules
-            if status in ['DSQ', 'DNF']:
-                score = starters_count + 1
-            else:
-                # Normal score with novice credit: max(1, finish_position - min(2, novice_count))
-                score = max(1, position - min(2, novices))
+            score = finish_score(status, position, novices, starters_count)
             
             results[boat] = {
                 'boat': boat,
@@ -482,7 +738,15 @@ class EnhancedChatParser:
         Returns week dict with either definitive 'results' or 'results_provisional' if ambiguous.
         """
         claims = self.extract_individual_claims(messages)
-        finish_order, ambiguity = self.build_finish_order(claims)
+        cited = cited_messages(messages, claims)
+        graph = self._build_claim_graph(claims)
+        dropped_claims = []
+        if graph.has_cycle:
+            cycle_note = f"Contradicting claims among {', '.join(sorted(b for cycle in graph.cycles for b in cycle))}"
+            graph, dropped_claims = self.resolve_claim_conflicts(claims, messages)
+        finish_order, ambiguity = self.build_finish_order(claims, messages, graph)
+        if dropped_claims and ambiguity is None and not any(c['type'] == 'complete_finish_order' for c in claims):
+            ambiguity = f"Ambiguous finish order: {cycle_note}; dropped {len(dropped_claims)} claim(s) to resolve"
 
         if not finish_order:
             return {
@@ -490,18 +754,13 @@ class EnhancedChatParser:
                 'starters': [],
                 'results': [],
                 'evidence': claims,
+                'messages': cited,
                 'ambiguity': ambiguity or "No race data found",
                 'status': 'NO_RACE'
             }
 
-        # Build relative graph edges for ranges
-        edges = []
-        for c in claims:
-            if c.get('type') == 'relative_position':
-                edges.append((c['boat_ahead'], c['boat_behind']))
-
         # Compute ranges (even if unambiguous, helpful for transparency)
-        ranges = self._compute_position_ranges(finish_order, edges)
+        ranges = self._compute_position_ranges(finish_order, graph)
 
         boat_results = self.calculate_scores(finish_order, claims)
         valid_starters = [b for b in finish_order if self.is_valid_boat_name(b)]
@@ -528,12 +787,15 @@ class EnhancedChatParser:
                 'starters': valid_starters,
                 'results_provisional': provisional,
                 'evidence': claims,
+                'messages': cited,
                 'ambiguity': {
                     'description': ambiguity,
                     'ranges': {b: {'min': ranges[b][0], 'max': ranges[b][1]} for b in finish_order}
                 },
                 'status': 'AMBIGUOUS'
             }
+            if dropped_claims:
+                week['ambiguity']['dropped_claims'] = dropped_claims
         else:
             results_list = []
             for b in finish_order:
@@ -548,131 +810,521 @@ class EnhancedChatParser:
                 'starters': valid_starters,
                 'results': results_list,
                 'evidence': claims,
+                'messages': cited,
                 'ambiguity': None,
                 'status': 'OK'
             }
 
-        # Track cumulative boats for DNC scoring later (only if there were starters)
-        if valid_starters:
-            self._weekly_boats_seen |= set(valid_starters)
-
+        if not any(c['type'] == 'complete_finish_order' for c in claims):
+            self._apply_position_distribution(week, graph, valid_starters, ranges)
         return week
+
+    def _apply_position_distribution(self, week: Dict, graph: ClaimGraph, starters: List[str],
+                                     ranges: Dict[str, Tuple[int, int]]):
+        """When the claims leave the order open, attach each starter's exact (or sampled)
+        finish-position distribution over all consistent orders, with expected position
+        and score; with expected_scores, finishers are scored by that expectation."""
+        if all(ranges[b][0] == ranges[b][1] for b in starters):
+            return
+        distribution = position_distribution(starters, graph.ahead_masks(starters), week['date'])
+        if distribution is None:
+            return
+        key = 'results' if 'results' in week else 'results_provisional'
+        for r in week[key]:
+            probabilities = distribution['probabilities'][r['boat']]
+            expected_pos = sum(p * k for k, p in enumerate(probabilities, 1))
+            if r['status'] in ('DSQ', 'DNF'):
+                expected_score = r['score']
+            else:
+                expected_score = sum(p * finish_score(r['status'], k, r['novices'], len(starters))
+                                     for k, p in enumerate(probabilities, 1))
+            r['expected_pos'] = round(expected_pos, 3)
+            r['expected_score'] = round(expected_score, 3)
+            if self.expected_scores:
+                r['score'] = round(expected_score, 2)
+        distribution['probabilities'] = {b: [round(p, 4) for p in row] for b, row in distribution['probabilities'].items()}
+        week['position_distribution'] = distribution
     
-    def generate_results(self) -> Dict:
+    def process_weekly_race_cached(self, date: str, messages: List[Message]) -> Dict:
+        """process_weekly_race, served from the week cache when the same messages,
+        boats.json and parser version were processed before."""
+        return self.process_weeks({date: messages})[date]
+
+    def process_weeks(self, weekly_races: Dict[str, List[Message]], pool: Optional[Executor] = None) -> Dict[str, Dict]:
+        """Run process_weekly_race for every week, independently of the others.
+
+        Weeks found in the week cache are loaded; the rest are processed in
+        ``pool`` if given (e.g. one shared by a batch run), else in ``self.jobs``
+        worker processes (or in-process when jobs is 1)."""
+        weeks: Dict[str, Dict] = {}
+        keys: Dict[str, str] = {}
+        pending = []
+        for date, messages in weekly_races.items():
+            if self.week_cache:
+                keys[date] = week_key(date, messages, self._boats_digest, 'expected' if self.expected_scores else '')
+                week = self.week_cache.get(keys[date])
+                if week is not None:
+                    weeks[date] = week
+                    continue
+            pending.append(date)
+
+        if pool is not None and pending:
+            weeks.update(zip(pending, self._map_weeks(pool, pending, weekly_races)))
+        elif self.jobs > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=self.jobs) as own_pool:
+                weeks.update(zip(pending, self._map_weeks(own_pool, pending, weekly_races)))
+        else:
+            for date in pending:
+                weeks[date] = self.process_weekly_race(date, weekly_races[date])
+
+        if self.week_cache:
+            for date in pending:
+                self.week_cache.put(keys[date], weeks[date])
+        return weeks
+
+    def _map_weeks(self, pool: Executor, dates: List[str], weekly_races: Dict[str, List[Message]]) -> List[Dict]:
+        """process_weekly_race for each date in worker processes, results in date order"""
+        return list(pool.map(_process_week_in_worker, dates, [weekly_races[d] for d in dates],
+                             [self.boats_json_path] * len(dates), [self.expected_scores] * len(dates)))
+
+    def generate_results(self, pool: Optional[Executor] = None) -> Dict:
         """Generate the complete results JSON"""
         self.parse_chat_file()
         
-        # Process each Wednesday race
+        # Per-week processing is independent; DNC and standings need date order
+        processed = self.process_weeks(self.weekly_races, pool)
+        results = self.fold_weeks(processed[date] for date in sorted(processed))
+        if self.database:
+            self.database.write_results(results, os.path.abspath(self.chat_file_path))
+        return results
+
+    def stream_results(self, path: str, pool: Optional[Executor] = None, evidence: str = 'table',
+                       week_at_a_time: bool = False) -> int:
+        """generate_results, but each week goes to a results stream (see results_stream.py)
+        as soon as it is folded instead of being kept; returns the number of weeks written.
+
+        With ``week_at_a_time`` the export is not stored either: messages are read
+        straight off it (iter_race_weeks), so memory is bounded by the largest week."""
+        if week_at_a_time:
+            race_weeks = self.iter_race_weeks()
+        else:
+            self.parse_chat_file()
+            race_weeks = sorted(self.weekly_races.items())
+        with ResultsStreamWriter(path, evidence) as stream:
+            for week in self.iter_folded_weeks(self.iter_processed_weeks(race_weeks, pool)):
+                stream.write_week(week)
+            stream.write_series(self.series_data)
+        return stream.weeks
+
+    def iter_race_weeks(self) -> Iterator[Tuple[str, List[Message]]]:
+        """(date, messages) of each race Wednesday, straight off the export in one pass.
+
+        Only the current Wednesday's messages are held; the week is yielded as soon
+        as a message from a later day shows it is over, and other days' messages are
+        dropped as they are read. A message for an already yielded Wednesday (the
+        export out of order) cannot be scored and is reported."""
+        date: Optional[str] = None
+        day = last_day = None
+        week: List[Message] = []
+        late = 0
+        for message in self.iter_messages():
+            message_day = message.timestamp.date()
+            if day is not None and message_day > day:
+                yield date, week
+                date, day, week = None, None, []
+            if message.timestamp.weekday() != 2:  # Wednesday is 2
+                continue
+            if day is None and (last_day is None or message_day > last_day):
+                date, day, last_day = message_day.strftime("%Y-%m-%d"), message_day, message_day
+            if message_day == day:
+                week.append(message._replace(raw_line=None))
+            else:
+                late += 1
+        if day is not None:
+            yield date, week
+        if late:
+            print(f"Warning: {late} message(s) dated after their race Wednesday had been scored were skipped")
+
+    def iter_processed_weeks(self, race_weeks: Iterable[Tuple[str, List[Message]]],
+                             pool: Optional[Executor] = None) -> Iterator[Dict]:
+        """process_weeks over (date, messages) pairs in date order, ``self.jobs`` weeks
+        at a time, yielding each processed week"""
+        if pool is None and self.jobs > 1:
+            with ProcessPoolExecutor(max_workers=self.jobs) as own_pool:
+                yield from self.iter_processed_weeks(race_weeks, own_pool)
+            return
+        race_weeks = iter(race_weeks)
+        step = max(1, self.jobs)
+        while True:
+            batch = dict(itertools.islice(race_weeks, step))
+            if not batch:
+                break
+            processed = self.process_weeks(batch, pool)
+            for date in batch:
+                yield processed.pop(date)
+
+    def fold_weeks(self, processed_weeks: Iterable[Dict]) -> Dict:
+        """Sequential pass over processed weeks in date order: DNC scoring against
+        the boats seen so far, boats_seen, and series standings."""
+        self.series_data['weeks'] = list(self.iter_folded_weeks(processed_weeks))
+        return {"series": self.series_data}
+
+    def iter_folded_weeks(self, processed_weeks: Iterable[Dict]) -> Iterator[Dict]:
+        """fold_weeks one week at a time, yielding each scored week once its DNC
+        entries are final; boats_seen and standings are set when it is exhausted"""
         boats_with_results = set()
-        weeks = []
         cumulative_series_boats: Set[str] = set()
-        for date in sorted(self.weekly_races.keys()):
-            week_data = self.process_weekly_race(date, self.weekly_races[date])
+        self.standings = SeriesStandings()
+        for week_data in processed_weeks:
+            # Track cumulative boats for DNC scoring later (only if there were starters)
+            if week_data.get('starters'):
+                self._weekly_boats_seen |= set(week_data['starters'])
             # Determine if we treat as a scored race (starters > 0 and have some result info)
-            has_results = bool(week_data.get('results')) or bool(week_data.get('results_provisional'))
-            if has_results and week_data.get('starters'):
+            if self.is_scored_week(week_data):
                 # Apply DNC scoring BEFORE adding this week's starters to cumulative set for next week
                 self._apply_dnc(week_data if 'results' in week_data else week_data, cumulative_series_boats)
                 cumulative_series_boats |= set(week_data['starters'])
-                weeks.append(week_data)
+                self.standings.set_week(week_data)
                 for section in ['results', 'results_provisional']:
                     if section in week_data:
                         for result in week_data[section]:
                             if result.get('status') not in ('DNC',) and result.get('boat'):
                                 boats_with_results.add(result['boat'])
+                yield week_data
 
-        self.series_data['weeks'] = weeks
         self.series_data['boats_seen'] = sorted(list(boats_with_results))
 
         # Compute standings
         self._compute_standings()
-        return {"series": self.series_data}
+
+    @staticmethod
+    def is_scored_week(week: Dict) -> bool:
+        """A week counts in the series if it had starters and some result info"""
+        has_results = bool(week.get('results')) or bool(week.get('results_provisional'))
+        return has_results and bool(week.get('starters'))
+
+    def refold_from(self, processed_weeks: Dict[str, Dict], start: str) -> List[str]:
+        """fold_weeks again from date ``start`` on, keeping the folded weeks before it.
+
+        ``processed_weeks`` maps every date to its week as process_weekly_race
+        returned it (copies are folded). DNC scores after ``start`` and the
+        standings are brought up to date; returns the dates of the re-folded
+        scored weeks."""
+        weeks = [w for w in self.series_data['weeks'] if w['date'] < start]
+        for w in self.series_data['weeks']:
+            if w['date'] >= start:
+                self.standings.remove_week(w['date'])
+        cumulative_series_boats: Set[str] = set()
+        for w in weeks:
+            cumulative_series_boats |= set(w['starters'])
+        refolded = []
+        for date in sorted(d for d in processed_weeks if d >= start):
+            week_data = copy.deepcopy(processed_weeks[date])
+            if week_data.get('starters'):
+                self._weekly_boats_seen |= set(week_data['starters'])
+            if self.is_scored_week(week_data):
+                self._apply_dnc(week_data, cumulative_series_boats)
+                cumulative_series_boats |= set(week_data['starters'])
+                weeks.append(week_data)
+                self.standings.set_week(week_data)
+                refolded.append(date)
+
+        self.series_data['weeks'] = weeks
+        self.series_data['boats_seen'] = sorted({
+            result['boat'] for week_data in weeks for section in ('results', 'results_provisional')
+            for result in week_data.get(section, []) if result.get('status') != 'DNC' and result.get('boat')})
+        self._compute_standings()
+        return refolded
 
     def _compute_standings(self):
         """Compute series standings with throwouts (1 worst per 4 races)."""
-        # Collect scores per boat
-        boat_scores: Dict[str, List[int]] = defaultdict(list)
-        race_count = 0
-        for w in self.series_data['weeks']:
-            # Only count races with starters
-            if not w.get('starters'):
-                continue
-            race_count += 1
-            # Choose appropriate results key
-            key = 'results' if 'results' in w else 'results_provisional'
-            for r in w[key]:
-                if r['status'] == 'DNC':
-                    boat_scores[r['boat']].append(r['score'])
-                elif r.get('pos') is not None:
-                    boat_scores[r['boat']].append(r['score'])
-
-        throwouts = race_count // 4
-        standings = []
-        for boat, scores in boat_scores.items():
-            sorted_scores = sorted(scores, reverse=True)  # worst first
-            dropped = sorted_scores[:throwouts]
-            kept = sorted_scores[throwouts:]
-            standings.append({
-                'boat': boat,
-                'races': len(scores),
-                'raw_total': sum(scores),
-                'dropped': dropped,
-                'net': sum(kept)
-            })
-        standings.sort(key=lambda x: (x['net'], x['raw_total']))
-        self.series_data['standings'] = standings
+        self.series_data['standings'] = self.standings.table()
+
+    def update_week(self, week: Dict):
+        """Apply a corrected (already DNC-scored) week and refresh standings incrementally."""
+        for i, w in enumerate(self.series_data['weeks']):
+            if w['date'] == week['date']:
+                self.series_data['weeks'][i] = week
+                break
+        else:
+            self.series_data['weeks'].append(week)
+            self.series_data['weeks'].sort(key=lambda w: w['date'])
+        self.standings.set_week(week)
+        self._compute_standings()
+
+    def what_if(self, date: str, boat: str, status: str, pos: Optional[int] = None) -> List[Dict]:
+        """Standings if a boat had a different status (FIN/DSQ/DNF) in one week,
+        e.g. what_if('2025-07-23', 'Ambush', 'DSQ'); stored results are unchanged."""
+        normalized, _ = self.normalize_boat_name(boat)
+        return self.standings.what_if(date, normalized, status.upper(), pos)
 
     # ------------------------------ Output Helpers ------------------------------
-    def write_week_files(self):
-        """Emit per-week JSON and Markdown files in results/ directory."""
-        os.makedirs('results', exist_ok=True)
-        for w in self.series_data['weeks']:
-            date = w['date']
-            json_path = os.path.join('results', f"{date}.auto.json")
-            md_path = os.path.join('results', f"{date}.auto.md")
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(w, f, indent=2, ensure_ascii=False)
-            # Markdown table
-            lines = [f"# {date} Results (Auto Parsed)", ""]
-            if w.get('ambiguity'):
-                lines.append(f"Ambiguity: {w['ambiguity']['description'] if isinstance(w['ambiguity'], dict) else w['ambiguity']}")
-                lines.append("")
-            header = "| Pos | Boat | Range | Novices | Status | Score |"
-            lines += [header, "|---:|---|---|---:|---|---:|"]
-            key = 'results' if 'results' in w else 'results_provisional'
-            for r in w[key]:
-                pos_display = r['pos'] if r.get('pos') is not None else ''
-                rng = r.get('range', '') if 'range' in r else r.get('range', '')
-                lines.append(f"| {pos_display} | {r['boat']} | {rng} | {r.get('novices',0)} | {r.get('status','FIN')} | {r.get('score','')} |")
+    def write_week_files(self, output_dir: str = '.', dates: Optional[Iterable[str]] = None,
+                         writer: Optional[OutputWriter] = None, evidence: str = 'table'):
+        """Emit per-week JSON and Markdown files in the results/ directory under output_dir
+        (only for ``dates``, if given), with ``evidence`` 'table' or 'inline'. Files go
+        through ``writer`` if given, else are written before returning; either way only
+        changed files are rewritten."""
+        results_dir = os.path.join(output_dir, 'results')
+        only = set(dates) if dates is not None else None
+        with contextlib.nullcontext(writer) if writer else OutputWriter() as out:
+            for w in self.series_data['weeks']:
+                if only is None or w['date'] in only:
+                    for path, content in self.render_week_files(w, results_dir, evidence):
+                        out.add(path, content)
+
+    @staticmethod
+    def render_week_files(w: Dict, results_dir: str, evidence: str = 'table') -> List[Tuple[str, str]]:
+        """(path, content) of one week's .auto.json and .auto.md files"""
+        date = w['date']
+        json_path = os.path.join(results_dir, f"{date}.auto.json")
+        md_path = os.path.join(results_dir, f"{date}.auto.md")
+        lines = [f"# {date} Results (Auto Parsed)", ""]
+        if w.get('ambiguity'):
+            lines.append(f"Ambiguity: {w['ambiguity']['description'] if isinstance(w['ambiguity'], dict) else w['ambiguity']}")
             lines.append("")
-            lines.append("## Evidence")
-            for ev in w.get('evidence', []):
-                lines.append(f"- [{ev.get('timestamp','')}] {ev.get('author','')} — {ev.get('text','').replace('|','/')}" )
-            with open(md_path, 'w', encoding='utf-8') as f:
-                f.write("\n".join(lines))
+        header = "| Pos | Boat | Range | Novices | Status | Score |"
+        lines += [header, "|---:|---|---|---:|---|---:|"]
+        key = 'results' if 'results' in w else 'results_provisional'
+        for r in w[key]:
+            pos_display = r['pos'] if r.get('pos') is not None else ''
+            rng = r.get('range', '') if 'range' in r else r.get('range', '')
+            lines.append(f"| {pos_display} | {r['boat']} | {rng} | {r.get('novices',0)} | {r.get('status','FIN')} | {r.get('score','')} |")
+        lines.append("")
+        lines.append("## Evidence")
+        for ev in w.get('evidence', []):
+            message = claim_message(w, ev)
+            lines.append(f"- [{message.get('timestamp','')}] {message.get('author','')} — {claim_text(message, ev).replace('|','/')}" )
+        week_json = json.dumps(w if evidence == 'table' else expand_evidence(w), indent=2, ensure_ascii=False)
+        return [(json_path, week_json), (md_path, "\n".join(lines))]
+
+# ------------------------------ Worker processes ------------------------------
+# One parser per boats.json per worker process, so a pool shared by several
+# series builds each fleet's mappings and alias resolver only once
+_worker_parsers: Dict[Tuple[str, bool], EnhancedChatParser] = {}
+
+
+def _process_week_in_worker(date: str, messages: List[Message], boats_json_path: str, expected_scores: bool) -> Dict:
+    parser = _worker_parsers.get((boats_json_path, expected_scores))
+    if parser is None:
+        parser = EnhancedChatParser('', boats_json_path, expected_scores=expected_scores)
+        _worker_parsers[(boats_json_path, expected_scores)] = parser
+    return parser.process_weekly_race(date, messages)
+
+
+# ------------------------------ Entry points ------------------------------
+def write_results_json(results: Dict, path: str = 'results.json', writer: Optional[OutputWriter] = None,
+                       evidence: str = 'table'):
+    """Write the full series results JSON, with ``evidence`` 'table' or 'inline'
+    (via ``writer`` if given, else now; unchanged files are skipped)"""
+    if evidence != 'table':
+        results = expand_results(results)
+    with contextlib.nullcontext(writer) if writer else OutputWriter() as out:
+        out.add(path, json.dumps(results, indent=2, ensure_ascii=False))
+
+
+def write_season_columns(results: Dict, path: str = 'season_columns.json', writer: Optional[OutputWriter] = None):
+    """Write every scored result of the series as one compact columnar file
+    (one list per field, rows indexed into 'dates'), the input format
+    generate_final_results.py reads fastest."""
+    dates = []
+    columns = {'date': [], 'boat': [], 'pos': [], 'novices': [], 'status': [], 'score': []}
+    for week in results['series']['weeks']:
+        key = 'results' if 'results' in week else 'results_provisional'
+        rows = [r for r in week.get(key, []) if r.get('score') is not None]
+        if not rows:
+            continue
+        dates.append(week['date'])
+        for r in rows:
+            columns['date'].append(len(dates) - 1)
+            columns['boat'].append(r['boat'])
+            columns['pos'].append(r.get('pos'))
+            columns['novices'].append(r.get('novices', 0))
+            columns['status'].append(r.get('status', 'FIN'))
+            columns['score'].append(r['score'])
+    with contextlib.nullcontext(writer) if writer else OutputWriter() as out:
+        out.add(path, json.dumps({'format': SEASON_COLUMNS_FORMAT, 'dates': dates, 'columns': columns},
+                                 ensure_ascii=False, separators=(',', ':')))
+
+
+def load_manifest(manifest_path: str) -> List[Dict[str, str]]:
+    """Read a batch manifest: a JSON list of {"chat", "boats", "output"} entries.
+
+    Relative paths are resolved against the manifest's directory; "boats"
+    defaults to boats.json next to the chat file."""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    series = []
+    for entry in entries:
+        chat = os.path.join(base, entry['chat'])
+        boats = os.path.join(base, entry['boats']) if 'boats' in entry else os.path.join(os.path.dirname(chat), 'boats.json')
+        series.append({
+            'name': entry.get('name', os.path.splitext(os.path.basename(entry['output'].rstrip('/\\')))[0]),
+            'chat': chat,
+            'boats': boats,
+            'output': os.path.join(base, entry['output'])
+        })
+    return series
+
+
+def _run_series(entry: Dict[str, str], pool: Executor, cache_dir: Optional[str], expected_scores: bool = False) -> Dict:
+    """Score one series of a batch and write its outputs; returns its timing row"""
+    start = time.perf_counter()
+    parser = EnhancedChatParser(entry['chat'], entry['boats'], cache_dir=cache_dir, expected_scores=expected_scores)
+    results = parser.generate_results(pool)
+    scored = time.perf_counter()
+    with OutputWriter() as writer:
+        write_results_json(results, os.path.join(entry['output'], 'results.json'), writer)
+        write_season_columns(results, os.path.join(entry['output'], 'season_columns.json'), writer)
+        parser.write_week_files(entry['output'], writer=writer)
+    return {
+        'name': entry['name'],
+        'messages': len(parser.messages),
+        'weeks': len(results['series']['weeks']),
+        'cache_hits': parser.week_cache.hits if parser.week_cache else 0,
+        'score_seconds': scored - start,
+        'write_seconds': time.perf_counter() - scored,
+    }
+
+
+def run_batch(manifest_path: str, jobs: int, cache_dir: Optional[str], expected_scores: bool = False) -> List[Dict]:
+    """Score every series in a manifest concurrently, sharing one worker pool"""
+    series = load_manifest(manifest_path)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool, ThreadPoolExecutor(max_workers=max(1, len(series))) as runner:
+        timings = list(runner.map(lambda entry: _run_series(entry, pool, cache_dir, expected_scores), series))
+    total = time.perf_counter() - start
+
+    print(f"{'Series':<24} {'Messages':>9} {'Weeks':>6} {'Cached':>7} {'Score s':>8} {'Write s':>8}")
+    for t in timings:
+        print(f"{t['name']:<24} {t['messages']:>9} {t['weeks']:>6} {t['cache_hits']:>7} "
+              f"{t['score_seconds']:>8.3f} {t['write_seconds']:>8.3f}")
+    print(f"{len(timings)} series in {total:.3f}s with {jobs} worker processes")
+    return timings
+
+
+def _write_profile(profiler: StageProfiler):
+    profiler.stop()
+    profiler.write('profile.json', 'profile.folded')
+    print(f"Profile written to profile.json and profile.folded:\n{profiler.summary()}")
+
 
 def main():
-    if len(sys.argv) > 1:
-        chat_file = sys.argv[1]
-    else:
-        chat_file = '_chat.txt'
+    arg_parser = argparse.ArgumentParser(description="Parse a WNR WhatsApp chat export into results.json")
+    arg_parser.add_argument('chat_file', nargs='?', default='_chat.txt', help="WhatsApp chat export (default: _chat.txt)")
+    arg_parser.add_argument('--boats', default='boats.json', help="boat alias file (default: boats.json)")
+    arg_parser.add_argument('--cache-dir', metavar='DIR',
+                            help="keep a per-week results cache in DIR, e.g. .wnr_cache (default: no cache)")
+    arg_parser.add_argument('--no-cache', action='store_true', help="ignore --cache-dir: process every week from scratch")
+    arg_parser.add_argument('--jobs', '-j', type=int, default=1, metavar='N', help="worker processes for per-week processing (default: 1)")
+    arg_parser.add_argument('--expected-scores', action='store_true',
+                            help="score finishers of partially ordered weeks by expected position over all consistent orders")
+    arg_parser.add_argument('--what-if', nargs=3, metavar=('DATE', 'BOAT', 'STATUS'),
+                            help="print standings as if BOAT had STATUS (DSQ/DNF/FIN) on DATE, e.g. 2025-07-23 Ambush DSQ")
+    arg_parser.add_argument('--week', metavar='DATE',
+                            help="process only the race on DATE (YYYY-MM-DD), seeking to it via the export's week index, and print its JSON")
+    arg_parser.add_argument('--db', metavar='PATH',
+                            help="keep messages, claims and results in a SQLite database, parsing only new messages on later runs")
+    arg_parser.add_argument('--checkpoint', metavar='PATH',
+                            help="save the parsed messages and how far the export was read in PATH, and on later runs "
+                                 "parse only what was appended since (the last message is read again)")
+    arg_parser.add_argument('--profile', action='store_true',
+                            help="record time, calls and allocations per stage and week in profile.json and profile.folded "
+                                 "(runs in-process, without the week cache)")
+    arg_parser.add_argument('--watch', action='store_true',
+                            help="keep running: re-score only the weeks touched by lines appended to the chat or by boats.json edits")
+    arg_parser.add_argument('--evidence', choices=EVIDENCE_FORMATS, default='table',
+                            help="cite each claim's message by ID from a per-week 'messages' table (table, default) "
+                                 "or write the message into every claim citing it (inline)")
+    arg_parser.add_argument('--stream', metavar='PATH',
+                            help="write the series as newline-delimited JSON to PATH, one week at a time as each is "
+                                 "final, instead of results.json and season_columns.json")
+    arg_parser.add_argument('--week-at-a-time', action='store_true',
+                            help="with --stream: read the export in one pass holding only the current race "
+                                 "Wednesday's messages, so memory is bounded by the largest week")
+    arg_parser.add_argument('--batch', metavar='MANIFEST',
+                            help="score every series in a JSON manifest of {chat, boats, output} entries")
+    args = arg_parser.parse_args()
+    if args.stream and args.db:
+        arg_parser.error("--stream does not keep the series, so it cannot be stored with --db")
+    if args.week_at_a_time and not args.stream:
+        arg_parser.error("--week-at-a-time writes a results stream: give --stream PATH")
+    if args.checkpoint and (args.db or args.watch or args.batch or args.week or args.week_at_a_time):
+        arg_parser.error("--checkpoint resumes a whole-export parse: it cannot be combined with --db, --watch, "
+                         "--batch, --week or --week-at-a-time")
+    cache_dir = None if args.no_cache else args.cache_dir
+
+    if args.batch:
+        run_batch(args.batch, max(1, args.jobs), cache_dir, args.expected_scores)
+        return
+    if args.watch:
+        from incremental import watch  # imports this module
+        watch(args.chat_file, args.boats, expected_scores=args.expected_scores, evidence=args.evidence,
+              cache_dir=cache_dir, jobs=args.jobs)
+        return
     
-    parser = EnhancedChatParser(chat_file)
+    profiler = None
+    if args.profile:
+        # Profile the actual work: no cache hits, no worker processes
+        cache_dir, args.jobs = None, 1
+        profiler = StageProfiler(allocations=True)
+    parser = EnhancedChatParser(args.chat_file, args.boats, cache_dir=cache_dir, jobs=args.jobs, expected_scores=args.expected_scores,
+                                db_path=args.db, checkpoint_path=args.checkpoint)
+    if profiler:
+        parser.attach_profiler(profiler)
+
+    if args.week:
+        # One week on its own: no series-wide DNC entries
+        week = parser.process_weekly_race_cached(args.week, parser.load_week(args.week))
+        print(json.dumps(week if args.evidence == 'table' else expand_evidence(week), indent=2, ensure_ascii=False))
+        return
+    if args.stream:
+        weeks = parser.stream_results(args.stream, evidence=args.evidence, week_at_a_time=args.week_at_a_time)
+        print(f"Results streamed to {args.stream}: {weeks} race weeks")
+        if profiler:
+            _write_profile(profiler)
+        print(f"Boats seen: {parser.series_data['boats_seen']}")
+        return
     results = parser.generate_results()
     
-    # Write results to JSON file
-    with open('results.json', 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    # Write results to JSON file (only files whose content changed)
+    writer = OutputWriter()
+    with profiler.stage('write_results_json') if profiler else contextlib.nullcontext():
+        write_results_json(results, writer=writer, evidence=args.evidence)
+    with profiler.stage('write_season_columns') if profiler else contextlib.nullcontext():
+        write_season_columns(results, writer=writer)
+    with profiler.stage('write_outputs') if profiler else contextlib.nullcontext():
+        writer.flush()
     
-    print(f"Results written to results.json")
+    print(f"Results written to results.json and season_columns.json ({writer.summary()})")
+    if profiler:
+        _write_profile(profiler)
+    if args.db:
+        print(f"Messages, claims and results stored in {args.db}")
     print(f"Found {len(results['series']['weeks'])} race weeks with results")
     print(f"Boats seen: {results['series']['boats_seen']}")
+    usage = parser.messages.memory_usage()
+    print(f"Message store: {usage['messages']} messages, {usage['bytes']:,} bytes ({usage['bytes_per_message']:.1f} bytes/message)")
     
     # Print summary of each week
     for week in results['series']['weeks']:
-        print(f"\n{week['date']}: {len(week['results'])} boats")
+        print(f"\n{week['date']}: {len(week.get('results', week.get('results_provisional', [])))} boats")
         if week['ambiguity']:
-            print(f"  Note: {week['ambiguity']}")
+            print(f"  Note: {expand_evidence(week)['ambiguity']}")
+
+    if args.what_if:
+        date, boat, status = args.what_if
+        try:
+            standings = parser.what_if(date, boat, status)
+        except ValueError as e:
+            arg_parser.error(f"--what-if: {e}")
+        current = {row['boat']: rank for rank, row in enumerate(results['series']['standings'], 1)}
+        print(f"\nWhat if {boat} was {status.upper()} on {date}:")
+        for rank, row in enumerate(standings, 1):
+            moved = current[row['boat']] - rank
+            change = f"+{moved}" if moved > 0 else (str(moved) if moved else "=")
+            print(f"  {rank:>2}. {row['boat']:<20} net {row['net']:>4}  raw {row['raw_total']:>4}  ({change})")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""
+Per-stage instrumentation for the parsing pipeline.
+
+A StageProfiler records, for each named stage, the number of calls, the
+inclusive wall time and (optionally, via tracemalloc) the net bytes allocated,
+both overall and per race week. Stages nest: every call is also attributed to
+its stack of enclosing stages, which gives the self time per stack for a
+flamegraph.
+
+Methods are instrumented per instance (``instrument`` shadows them with timed
+wrappers), so an object without a profiler runs the plain methods at no cost.
+
+The report is written as JSON plus a folded-stacks file ("a;b;c <µs>" per
+line) that flamegraph.pl, inferno and speedscope read.
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROFILE_FORMAT = 'wnr-profile/1'
+
+# method name -> (stage name, function of the call's args giving its week date, or None)
+StageSpec = Dict[str, Tuple[str, Optional[Callable]]]
+
+
+class StageStats:
+    __slots__ = ('calls', 'seconds', 'net_bytes')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.net_bytes = 0
+
+    def add(self, seconds: float, net_bytes: int):
+        self.calls += 1
+        self.seconds += seconds
+        self.net_bytes += net_bytes
+
+    def as_dict(self, allocations: bool) -> Dict:
+        row = {'calls': self.calls, 'seconds': round(self.seconds, 6)}
+        if allocations:
+            row['net_bytes'] = self.net_bytes
+        return row
+
+
+class StageProfiler:
+    """Wall time, call counts and allocations per pipeline stage and per week"""
+
+    def __init__(self, allocations: bool = False):
+        self.allocations = allocations
+        self.stages: Dict[str, StageStats] = {}
+        self.weeks: Dict[str, Dict[str, StageStats]] = {}
+        self.stacks: Dict[Tuple[str, ...], float] = {}  # stack -> inclusive seconds
+        self._stack: List[str] = []
+        self._week_stack: List[Optional[str]] = []
+        self._started = time.perf_counter()
+        self._started_tracing = False
+        if allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @contextmanager
+    def stage(self, name: str, week: Optional[str] = None):
+        """Time a block as stage ``name`` (of race ``week``, else of the enclosing week)"""
+        if week is None and self._week_stack:
+            week = self._week_stack[-1]
+        self._stack.append(name)
+        self._week_stack.append(week)
+        before = tracemalloc.get_traced_memory()[0] if self.allocations else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            net_bytes = tracemalloc.get_traced_memory()[0] - before if self.allocations else 0
+            stack = tuple(self._stack)
+            self._stack.pop()
+            self._week_stack.pop()
+            self.stages.setdefault(name, StageStats()).add(seconds, net_bytes)
+            if week is not None:
+                self.weeks.setdefault(week, {}).setdefault(name, StageStats()).add(seconds, net_bytes)
+            self.stacks[stack] = self.stacks.get(stack, 0.0) + seconds
+
+    def wrap(self, fn: Callable, name: str, week_of: Optional[Callable] = None) -> Callable:
+        """``fn`` timed as stage ``name``; ``week_of(args)`` names the week of a call"""
+        @wraps(fn)
+        def timed(*args, **kwargs):
+            with self.stage(name, week_of(args) if week_of else None):
+                return fn(*args, **kwargs)
+        return timed
+
+    def instrument(self, obj, spec: StageSpec):
+        """Shadow ``obj``'s methods named in ``spec`` with timed wrappers"""
+        for method, (name, week_of) in spec.items():
+            setattr(obj, method, self.wrap(getattr(obj, method), name, week_of))
+
+    def stop(self):
+        """Stop allocation tracing if this profiler started it"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def self_times(self) -> Dict[Tuple[str, ...], float]:
+        """Seconds spent in each stack excluding the stages nested in it"""
+        own = dict(self.stacks)
+        for stack, seconds in self.stacks.items():
+            if len(stack) > 1:
+                own[stack[:-1]] = own.get(stack[:-1], 0.0) - seconds
+        return {stack: max(0.0, seconds) for stack, seconds in own.items()}
+
+    def report(self) -> Dict:
+        """The profile as a JSON-serializable dict"""
+        stages = {name: stats.as_dict(self.allocations)
+                  for name, stats in sorted(self.stages.items(), key=lambda item: -item[1].seconds)}
+        return {
+            'format': PROFILE_FORMAT,
+            'wall_seconds': round(time.perf_counter() - self._started, 6),
+            'allocations': self.allocations,
+            'stages': stages,
+            'weeks': {week: {name: stats.as_dict(self.allocations) for name, stats in rows.items()}
+                      for week, rows in sorted(self.weeks.items())},
+            'stacks': {';'.join(stack): round(seconds, 6) for stack, seconds in sorted(self.self_times().items())},
+        }
+
+    def folded(self) -> str:
+        """Folded stacks with self time in microseconds, for flamegraph tools"""
+        return ''.join(f"{';'.join(stack)} {round(seconds * 1e6)}\n"
+                       for stack, seconds in sorted(self.self_times().items()) if seconds > 0)
+
+    def write(self, json_path: str = 'profile.json', folded_path: Optional[str] = 'profile.folded'):
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        if folded_path:
+            with open(folded_path, 'w', encoding='utf-8') as f:
+                f.write(self.folded())
+
+    def summary(self, limit: int = 12) -> str:
+        """Top stages by inclusive time, one per line"""
+        lines = []
+        for name, stats in sorted(self.stages.items(), key=lambda item: -item[1].seconds)[:limit]:
+            line = f"  {name:<28} {stats.seconds * 1000:10.1f} ms  {stats.calls:>9} calls"
+            if self.allocations:
+                line += f"  {stats.net_bytes / 1024:10.1f} KiB net"
+            lines.append(line)
+        return '\n'.join(lines)
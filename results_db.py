@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Optional SQLite store for parsed messages, claims, weeks, results and standings.
+
+EnhancedChatParser(db_path=...) keeps every parsed message of an export in
+the database along with the byte offset parsing reached. Later runs load the
+stored messages and only parse (and upsert) what was appended to the export
+since. Each generate_results run replaces that export's scored weeks, their
+claims (evidence), results and series standings in one transaction, so they
+can be queried without re-parsing, e.g.
+
+    python3 results_db.py wnr.sqlite claims caper --since 2025-07-01
+    python3 results_db.py wnr.sqlite results "psycho killer"
+
+Several exports (e.g. one per season) can share a database: every row is
+keyed by its export's absolute path, and queries cover all of them unless
+narrowed with --source.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from evidence import expand_claims
+
+SCHEMA_VERSION = 2
+# Tables rebuilt from the messages by every generate_results run, dropped when upgrading the schema
+DERIVED_TABLES = ('claim_boats', 'claims', 'results', 'weeks', 'standings')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL,
+    tail_sha1 TEXT NOT NULL,
+    last_timestamp TEXT
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    raw_start INTEGER NOT NULL,
+    raw_end INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    date TEXT NOT NULL,
+    author TEXT NOT NULL,
+    text TEXT NOT NULL,
+    UNIQUE (source, raw_start)
+);
+CREATE INDEX IF NOT EXISTS messages_date ON messages (date);
+CREATE INDEX IF NOT EXISTS messages_author ON messages (author, date);
+CREATE TABLE IF NOT EXISTS weeks (
+    source TEXT NOT NULL,
+    date TEXT NOT NULL,
+    status TEXT,
+    starters TEXT NOT NULL,
+    ambiguity TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (source, date)
+);
+CREATE TABLE IF NOT EXISTS claims (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    date TEXT NOT NULL,
+    type TEXT NOT NULL,
+    author TEXT,
+    timestamp TEXT,
+    text TEXT,
+    data TEXT NOT NULL,
+    FOREIGN KEY (source, date) REFERENCES weeks (source, date) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS claims_date ON claims (source, date);
+CREATE INDEX IF NOT EXISTS claims_author ON claims (author, date);
+CREATE TABLE IF NOT EXISTS claim_boats (
+    claim_id INTEGER NOT NULL REFERENCES claims (id) ON DELETE CASCADE,
+    boat TEXT NOT NULL,
+    PRIMARY KEY (claim_id, boat)
+);
+CREATE INDEX IF NOT EXISTS claim_boats_boat ON claim_boats (boat, claim_id);
+CREATE TABLE IF NOT EXISTS results (
+    source TEXT NOT NULL,
+    date TEXT NOT NULL,
+    boat TEXT NOT NULL,
+    pos INTEGER,
+    status TEXT NOT NULL,
+    novices INTEGER,
+    score NUMERIC,
+    PRIMARY KEY (source, date, boat),
+    FOREIGN KEY (source, date) REFERENCES weeks (source, date) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS results_boat ON results (boat, date);
+CREATE TABLE IF NOT EXISTS standings (
+    source TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    boat TEXT NOT NULL,
+    races INTEGER NOT NULL,
+    raw_total NUMERIC NOT NULL,
+    dropped TEXT NOT NULL,
+    net NUMERIC NOT NULL,
+    PRIMARY KEY (source, rank),
+    UNIQUE (source, boat)
+);
+"""
+
+# A stored message: (raw_start, raw_end, ISO timestamp, author, text)
+MessageRow = Tuple[int, int, str, str, str]
+
+
+def claim_boats(claim: Dict) -> List[str]:
+    """Boats a claim mentions"""
+    boats = [claim[key] for key in ('boat', 'boat_ahead', 'boat_behind') if claim.get(key)]
+    boats.extend(claim.get('finish_order') or [])
+    return sorted(set(boats))
+
+
+class ResultsDatabase:
+    """SQLite database of one or more chat exports and their scored series, keyed by export path"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, 1, SCHEMA_VERSION):
+            raise ValueError(f"{path}: unsupported database schema version {version}")
+        with self.conn:
+            if version == 1:
+                # Version 1 results had no source key; the next generate_results run restores them
+                for table in DERIVED_TABLES:
+                    self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> 'ResultsDatabase':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------ Messages ------------------------------
+    def source_state(self, source: str) -> Optional[Dict]:
+        """Offset, tail digest and newest timestamp stored for an export, or None"""
+        row = self.conn.execute("SELECT offset, tail_sha1, last_timestamp FROM sources WHERE path = ?",
+                                (source,)).fetchone()
+        return dict(row) if row else None
+
+    def iter_messages(self, source: str) -> Iterator[MessageRow]:
+        """Stored messages of an export in file order"""
+        return iter(self.conn.execute(
+            "SELECT raw_start, raw_end, timestamp, author, text FROM messages WHERE source = ? ORDER BY raw_start",
+            (source,)))
+
+    def reset_source(self, source: str):
+        """Forget an export's messages (e.g. after it was replaced)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM messages WHERE source = ?", (source,))
+            self.conn.execute("DELETE FROM sources WHERE path = ?", (source,))
+
+    def add_messages(self, source: str, rows: Iterable[MessageRow], offset: int, tail_sha1: str,
+                     last_timestamp: Optional[str]):
+        """Upsert parsed messages and record how far the export was parsed, in one transaction"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO messages (source, raw_start, raw_end, timestamp, date, author, text)"
+                " VALUES (?, ?, ?, ?, substr(?, 1, 10), ?, ?)"
+                " ON CONFLICT (source, raw_start) DO UPDATE SET raw_end = excluded.raw_end,"
+                " timestamp = excluded.timestamp, date = excluded.date, author = excluded.author, text = excluded.text",
+                ((source, start, end, timestamp, timestamp, author, text)
+                 for start, end, timestamp, author, text in rows))
+            self.conn.execute(
+                "INSERT INTO sources (path, offset, tail_sha1, last_timestamp) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (path) DO UPDATE SET offset = excluded.offset, tail_sha1 = excluded.tail_sha1,"
+                " last_timestamp = excluded.last_timestamp",
+                (source, offset, tail_sha1, last_timestamp))
+
+    # ------------------------------ Results ------------------------------
+    def write_results(self, results: Dict, source: str):
+        """Replace the weeks, claims, results and standings stored for export ``source`` with a scored series.
+
+        Weeks are stored as given (their evidence citing a message table); each claim row
+        carries its message's text, author and timestamp."""
+        series = results['series']
+        with self.conn:
+            # Cascades to the export's claims, claim_boats and results
+            self.conn.execute("DELETE FROM weeks WHERE source = ?", (source,))
+            self.conn.execute("DELETE FROM standings WHERE source = ?", (source,))
+            self.conn.executemany(
+                "INSERT INTO weeks (source, date, status, starters, ambiguity, data) VALUES (?, ?, ?, ?, ?, ?)",
+                ((source, week['date'], week.get('status'), json.dumps(week.get('starters', [])),
+                  json.dumps(week['ambiguity']) if week.get('ambiguity') else None,
+                  json.dumps(week, ensure_ascii=False)) for week in series['weeks']))
+            self.conn.executemany(
+                "INSERT INTO results (source, date, boat, pos, status, novices, score) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((source, week['date'], r['boat'], r.get('pos'), r.get('status', 'FIN'), r.get('novices'),
+                  r.get('score')) for week in series['weeks'] for r in week.get('results', [])))
+            for week in series['weeks']:
+                for claim in expand_claims(week.get('evidence', []), week.get('messages', {})):
+                    claim_id = self.conn.execute(
+                        "INSERT INTO claims (source, date, type, author, timestamp, text, data)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (source, week['date'], claim['type'], claim.get('author'), claim.get('timestamp'),
+                         claim.get('text'), json.dumps(claim, ensure_ascii=False))).lastrowid
+                    self.conn.executemany("INSERT INTO claim_boats (claim_id, boat) VALUES (?, ?)",
+                                          ((claim_id, boat) for boat in claim_boats(claim)))
+            self.conn.executemany(
+                "INSERT INTO standings (source, rank, boat, races, raw_total, dropped, net)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((source, rank, row['boat'], row['races'], row['raw_total'], json.dumps(row['dropped']), row['net'])
+                 for rank, row in enumerate(series['standings'], 1)))
+
+    # ------------------------------ Queries ------------------------------
+    # Each query covers every stored export, or only ``source`` (an export's absolute path) if given
+    def claims_mentioning(self, boat: str, since: Optional[str] = None, source: Optional[str] = None) -> List[Dict]:
+        """Claims naming a boat, from race weeks on or after ``since`` (YYYY-MM-DD)"""
+        rows = self.conn.execute(
+            "SELECT claims.source, claims.date, claims.data"
+            " FROM claim_boats JOIN claims ON claims.id = claim_boats.claim_id"
+            " WHERE claim_boats.boat = ? AND claims.date >= ? AND (? IS NULL OR claims.source = ?)"
+            " ORDER BY claims.date, claims.id",
+            (boat.lower(), since or '', source, source))
+        return [dict(json.loads(row['data']), date=row['date'], source=row['source']) for row in rows]
+
+    def boat_results(self, boat: str, since: Optional[str] = None, source: Optional[str] = None) -> List[Dict]:
+        """A boat's weekly results in date order"""
+        rows = self.conn.execute(
+            "SELECT source, date, pos, status, novices, score FROM results"
+            " WHERE boat = ? AND date >= ? AND (? IS NULL OR source = ?) ORDER BY date, source",
+            (boat.lower(), since or '', source, source))
+        return [dict(row) for row in rows]
+
+    def messages_by(self, author: str, since: Optional[str] = None, source: Optional[str] = None) -> List[Dict]:
+        """Messages posted by an author, oldest first"""
+        rows = self.conn.execute(
+            "SELECT source, timestamp, author, text FROM messages"
+            " WHERE author = ? AND date >= ? AND (? IS NULL OR source = ?) ORDER BY timestamp",
+            (author, since or '', source, source))
+        return [dict(row) for row in rows]
+
+    def standings(self, source: Optional[str] = None) -> List[Dict]:
+        """Stored series standings, best first (export by export)"""
+        rows = self.conn.execute(
+            "SELECT source, rank, boat, races, raw_total, dropped, net FROM standings"
+            " WHERE ? IS NULL OR source = ? ORDER BY source, rank", (source, source))
+        return [dict(row, dropped=json.loads(row['dropped'])) for row in rows]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Query a WNR results database written by parse_chat.py --db")
+    arg_parser.add_argument('db', help="SQLite database path")
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+    claims = commands.add_parser('claims', help="claims mentioning a boat")
+    claims.add_argument('boat')
+    claims.add_argument('--since', metavar='DATE', help="only race weeks on or after DATE (YYYY-MM-DD)")
+    results = commands.add_parser('results', help="a boat's weekly results")
+    results.add_argument('boat')
+    results.add_argument('--since', metavar='DATE', help="only race weeks on or after DATE (YYYY-MM-DD)")
+    messages = commands.add_parser('messages', help="messages posted by an author")
+    messages.add_argument('author')
+    messages.add_argument('--since', metavar='DATE', help="only messages on or after DATE (YYYY-MM-DD)")
+    standings = commands.add_parser('standings', help="series standings")
+    for command in (claims, results, messages, standings):
+        command.add_argument('--source', metavar='CHAT',
+                             help="only the series of this chat export (default: every export in the database)")
+    args = arg_parser.parse_args()
+
+    if not os.path.exists(args.db):
+        raise SystemExit(f"{args.db} not found")
+    source = os.path.abspath(args.source) if args.source else None
+    with ResultsDatabase(args.db) as db:
+        if args.command == 'claims':
+            rows = db.claims_mentioning(args.boat, args.since, source)
+        elif args.command == 'results':
+            rows = db.boat_results(args.boat, args.since, source)
+        elif args.command == 'messages':
+            rows = db.messages_by(args.author, args.since, source)
+        else:
+            rows = db.standings(source)
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
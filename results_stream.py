@@ -0,0 +1,85 @@
+"""
+Streaming series results as newline-delimited JSON.
+
+results.json holds the whole season in one document, so writing or reading
+it needs every week (evidence included) in memory at once. A results stream
+carries the same content one JSON object per line, written as soon as each
+part is final:
+
+    {"format": "wnr-results-stream/1"}
+    {"week": {...}}            one per scored week, in date order
+    {"standing": {...}}        one per standings row, in rank order
+    {"boats_seen": [...]}
+
+Writers and readers only ever hold one line, so memory stays flat however
+many weeks the archive spans.
+"""
+
+import json
+import os
+import tempfile
+from typing import Dict, Iterator, Tuple
+
+from evidence import expand_evidence
+from output_writer import NEW_FILE_MODE
+
+RESULTS_STREAM_FORMAT = 'wnr-results-stream/1'
+
+
+class ResultsStreamWriter:
+    """Writes a results stream to a temp file, renamed over ``path`` once finished"""
+
+    def __init__(self, path: str, evidence: str = 'table'):
+        self.path = path
+        self.evidence = evidence
+        self.weeks = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        os.chmod(self._tmp_path, NEW_FILE_MODE)
+        self._file = os.fdopen(fd, 'w', encoding='utf-8')
+        self._line({'format': RESULTS_STREAM_FORMAT})
+
+    def _line(self, record: Dict):
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write('\n')
+
+    def write_week(self, week: Dict):
+        """Append one scored week (its DNC entries final)"""
+        self._line({'week': week if self.evidence == 'table' else expand_evidence(week)})
+        self.weeks += 1
+
+    def write_series(self, series: Dict):
+        """Append the standings rows and the boats seen from a finished series"""
+        for row in series['standings']:
+            self._line({'standing': row})
+        self._line({'boats_seen': series['boats_seen']})
+
+    def close(self):
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        os.unlink(self._tmp_path)
+
+    def __enter__(self) -> 'ResultsStreamWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def iter_results_stream(path: str) -> Iterator[Tuple[str, object]]:
+    """(kind, value) per record of a results stream: ('week', dict), ('standing', dict) or ('boats_seen', list)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline() or 'null')
+        if not isinstance(header, dict) or header.get('format') != RESULTS_STREAM_FORMAT:
+            raise ValueError(f"{path} is not a {RESULTS_STREAM_FORMAT} results stream")
+        for line in f:
+            if line.strip():
+                (kind, value), = json.loads(line).items()
+                yield kind, value
@@ -9,76 +9,61 @@ Only the lines from the first encountered Wednesday onward are split; any
 pre-Wednesday preamble (e.g., group creation, adds) preceding the first
 Wednesday is omitted from the segmented files per user instruction that each
 file should start on a Wednesday.
+
+Segment boundaries come from the byte-offset week index (chat_index.py), kept
+in _chat.txt.index.json. Each segment is sliced out of a memory map of the
+export, and a file is only rewritten when its byte range or content hash
+changed since the previous run (or it is missing).
 """
 
 from __future__ import annotations
+import mmap
 import re
-from datetime import datetime
 from pathlib import Path
 import glob
 
+from chat_index import WeekIndex, index_path_for, parse_timestamp  # noqa: F401 (parse_timestamp re-exported)
+
 CHAT_FILE = Path('_chat.txt')
-DATE_PATTERN = re.compile(r'^\[(\d{1,2})/(\d{1,2})/(\d{2}), (\d{1,2}:\d{2}:\d{2})\s*([AP]M)\]')
+# Universal newlines, as the segments were always written with \n line endings
+NEWLINE_RE = re.compile(rb'\r\n?')
 
-def parse_timestamp(line: str) -> datetime | None:
-    m = DATE_PATTERN.match(line)
-    if not m:
-        return None
-    month, day, year2, timestr, ampm = m.groups()
-    timestr_full = f"{timestr} {ampm}"
-    try:
-        dt = datetime.strptime(f"{month}/{day}/{year2} {timestr_full}", "%m/%d/%y %I:%M:%S %p")
-        return dt
-    except ValueError:
-        return None
 
 def main():
     if not CHAT_FILE.exists():
         raise SystemExit("_chat.txt not found")
 
-    # Clean up previously generated segment files (pattern YYYY-MM-DD.chat.txt)
-    for path in glob.glob('20??-??-??.chat.txt'):
-        try:
-            Path(path).unlink()
-        except OSError:
-            pass
-
-    lines = CHAT_FILE.read_text(encoding='utf-8').splitlines(keepends=True)
-
-    current_wed_date: datetime | None = None  # datetime of the Wednesday that started current segment
-    current_segment_start_date: datetime | None = None  # date() of current Wednesday anchor
-    buffer: list[str] = []
-    created: list[str] = []
+    index_path = index_path_for(str(CHAT_FILE))
+    previous = WeekIndex.load(index_path)
+    if previous is not None and previous.is_current(str(CHAT_FILE)):
+        index = previous
+    else:
+        index = WeekIndex.build(str(CHAT_FILE))
 
-    def flush():
-        nonlocal buffer, current_wed_date
-        if current_wed_date and buffer:
-            out_name = current_wed_date.strftime('%Y-%m-%d') + '.chat.txt'
-            Path(out_name).write_text(''.join(buffer), encoding='utf-8')
-            created.append(out_name)
-        buffer = []
+    written: list[str] = []
+    unchanged = 0
+    if index.weeks:
+        with open(CHAT_FILE, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for span in index.weeks.values():
+                out_path = Path(f"{span.date}.chat.txt")
+                if previous is not None and previous.weeks.get(span.date) == span and out_path.exists():
+                    unchanged += 1
+                    continue
+                out_path.write_bytes(NEWLINE_RE.sub(b'\n', mm[span.start:span.end]))
+                written.append(out_path.name)
 
-    for line in lines:
-        dt = parse_timestamp(line)
-        if dt:
-            if dt.weekday() == 2:  # It's a Wednesday message
-                # If it's a new Wednesday date (distinct from current)
-                if current_segment_start_date is None or dt.date() != current_segment_start_date:
-                    flush()
-                    current_wed_date = dt
-                    current_segment_start_date = dt.date()
-            # We record lines only once we've started a Wednesday segment
-            if current_segment_start_date is not None:
-                buffer.append(line)
-        else:
-            # Non-timestamp continuation lines belong to current segment if started
-            if current_segment_start_date is not None:
-                buffer.append(line)
+    # Remove segment files (pattern YYYY-MM-DD.chat.txt) for weeks no longer in the export
+    for path in glob.glob('20??-??-??.chat.txt'):
+        if path[:10] not in index.weeks:
+            try:
+                Path(path).unlink()
+            except OSError:
+                pass
 
-    flush()
+    index.save(index_path)
 
-    print(f"Created {len(created)} Wednesday chat segment files:")
-    for name in created:
+    print(f"Wrote {len(written)} of {len(index.weeks)} Wednesday chat segment files ({unchanged} unchanged):")
+    for name in written:
         print(f"  {name}")
 
 if __name__ == '__main__':
@@ -0,0 +1,137 @@
+"""
+Incremental series standings for PPYC Wednesday Night Racing.
+
+Each boat keeps its scores in a sorted list with a running total, so adding,
+correcting or removing one week touches only the boats in that week
+(a bisect per score) and throw-outs are read off the top of each list.
+What-if queries swap one boat's score for one week, read the table and swap
+it back, without rerunning the parsing pipeline.
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+
+def finish_score(status: str, pos: Optional[int], novices: int, starters_count: int) -> int:
+    """Weekly score for a starter: DSQ/DNF = starters + 1, otherwise
+    max(1, finish_position - min(2, novice_count))"""
+    if status in ('DSQ', 'DNF'):
+        return starters_count + 1
+    return max(1, pos - min(2, novices))
+
+
+def _tidy(total):
+    """Round float totals (expected scores) to hundredths; integer totals pass through"""
+    return round(total, 2) if isinstance(total, float) else total
+
+
+class BoatScores:
+    """One boat's scores, kept sorted, plus where the boat first appeared"""
+    __slots__ = ('scores', 'total', 'appearances')
+
+    def __init__(self):
+        self.scores: List[int] = []
+        self.total = 0
+        self.appearances: List[Tuple[str, int]] = []  # sorted (date, index in week results)
+
+    def add(self, score: int, date: str, index: int):
+        insort(self.scores, score)
+        self.total += score
+        insort(self.appearances, (date, index))
+
+    def remove(self, score: int, date: str, index: int):
+        del self.scores[bisect_left(self.scores, score)]
+        self.total -= score
+        del self.appearances[bisect_left(self.appearances, (date, index))]
+
+    def dropped(self, throwouts: int) -> List[int]:
+        """The ``throwouts`` worst scores, worst first"""
+        return self.scores[-throwouts:][::-1] if throwouts else []
+
+
+class SeriesStandings:
+    """Series standings with throw-outs (1 worst per 4 races), updated a week at a time"""
+
+    def __init__(self, weeks: Optional[List[Dict]] = None):
+        self._entries: Dict[str, List[Dict]] = {}  # date -> scored results counted in standings
+        self._starters: Dict[str, int] = {}
+        self._boats: Dict[str, BoatScores] = {}
+        self.race_count = 0
+        for week in weeks or []:
+            self.set_week(week)
+
+    @staticmethod
+    def _scored_entries(week: Dict) -> List[Dict]:
+        """Results that count toward standings: DNC entries and boats with a position"""
+        key = 'results' if 'results' in week else 'results_provisional'
+        return [r for r in week.get(key, []) if r['status'] == 'DNC' or r.get('pos') is not None]
+
+    def set_week(self, week: Dict):
+        """Add a week, or replace an earlier version of the same date (a correction)"""
+        date = week['date']
+        self.remove_week(date)
+        if not week.get('starters'):
+            return
+        entries = [{'boat': r['boat'], 'status': r['status'], 'pos': r.get('pos'),
+                    'novices': r.get('novices', 0), 'score': r['score']} for r in self._scored_entries(week)]
+        self._entries[date] = entries
+        self._starters[date] = len(week['starters'])
+        self.race_count += 1
+        for index, entry in enumerate(entries):
+            self._boats.setdefault(entry['boat'], BoatScores()).add(entry['score'], date, index)
+
+    def remove_week(self, date: str):
+        """Drop a week's scores if present"""
+        entries = self._entries.pop(date, None)
+        if entries is None:
+            return
+        del self._starters[date]
+        self.race_count -= 1
+        for index, entry in enumerate(entries):
+            scores = self._boats[entry['boat']]
+            scores.remove(entry['score'], date, index)
+            if not scores.scores:
+                del self._boats[entry['boat']]
+
+    def table(self) -> List[Dict]:
+        """Standings rows sorted by net then raw total (ties by first appearance)"""
+        throwouts = self.race_count // 4
+        rows = []
+        for boat, scores in sorted(self._boats.items(), key=lambda item: item[1].appearances[0]):
+            dropped = scores.dropped(throwouts)
+            rows.append({
+                'boat': boat,
+                'races': len(scores.scores),
+                'raw_total': _tidy(scores.total),
+                'dropped': dropped,
+                'net': _tidy(scores.total - sum(dropped))
+            })
+        rows.sort(key=lambda x: (x['net'], x['raw_total']))
+        return rows
+
+    def what_if(self, date: str, boat: str, status: str, pos: Optional[int] = None) -> List[Dict]:
+        """Standings if ``boat`` had ``status`` (FIN/DSQ/DNF) on ``date``.
+
+        FIN needs a finish position (the boat's own one is used if omitted);
+        novice credit from that week is kept. The stored scores are untouched."""
+        if status not in ('FIN', 'DSQ', 'DNF'):
+            raise ValueError(f"Unknown status {status}: use FIN, DSQ or DNF")
+        if date not in self._entries:
+            raise ValueError(f"No scored race on {date}")
+        entries = self._entries[date]
+        index = next((i for i, e in enumerate(entries) if e['boat'] == boat), None)
+        if index is None or entries[index]['status'] == 'DNC':
+            raise ValueError(f"{boat} did not start on {date}")
+        entry = entries[index]
+        if status == 'FIN' and pos is None and entry['pos'] is None:
+            raise ValueError(f"A finish position is needed for {boat} on {date}")
+        new_score = finish_score(status, pos if pos is not None else entry['pos'], entry['novices'], self._starters[date])
+
+        scores = self._boats[boat]
+        scores.remove(entry['score'], date, index)
+        scores.add(new_score, date, index)
+        try:
+            return self.table()
+        finally:
+            scores.remove(new_score, date, index)
+            scores.add(entry['score'], date, index)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic WhatsApp exports for scaling tests.
+
+Generates a season of Wednesday races in the export format parse_chat.py
+reads, plus the matching boats.json. Each race has a hidden true finish order;
+skippers report "X ahead, Y behind" about the boats next to them, using
+canonical names, listed aliases or unlisted misspellings, with novice counts
+and DNF/DSQ reports mixed in. Some reports contradict the true order, and the
+race committee sometimes posts a full finish order. Non-race chatter
+(including multi-line messages and attachments) fills each week up to the
+requested message count. The same arguments and seed always give the same
+bytes.
+
+Usage: python3 synthetic_chat.py OUT_DIR [--messages N] [--boats N] [--weeks N] [--seed N] ...
+"""
+
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+FIRST_WEDNESDAY = datetime(2025, 4, 2)
+GROUP_NAME = 'Wednesday Night Racing'
+
+ADJECTIVES = ['Salty', 'Blue', 'Red', 'Wild', 'Lazy', 'Swift', 'Silent', 'Golden', 'Iron', 'Lucky',
+              'Rusty', 'Jolly', 'Misty', 'Crimson', 'Northern', 'Southern', 'Brave', 'Quiet', 'Dancing',
+              'Flying', 'Sleepy', 'Stormy', 'Sunny', 'Windy', 'Velvet', 'Copper', 'Silver', 'Emerald',
+              'Midnight', 'Electric']
+NOUNS = ['Heron', 'Fox', 'Otter', 'Pelican', 'Marlin', 'Falcon', 'Badger', 'Dolphin', 'Raven', 'Comet',
+         'Tern', 'Gull', 'Osprey', 'Kestrel', 'Mako', 'Puffin', 'Walrus', 'Coyote', 'Lynx', 'Wren',
+         'Albatross', 'Barracuda', 'Cormorant', 'Egret', 'Firefly', 'Gannet', 'Hornet', 'Ibis', 'Jaguar',
+         'Kingfisher']
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Casey', 'Morgan', 'Riley', 'Jamie', 'Drew', 'Quinn',
+               'Avery', 'Cameron', 'Dana', 'Emery', 'Finley', 'Harper', 'Jesse', 'Kendall', 'Logan', 'Parker']
+LAST_NAMES = ['Smith', 'Lee', 'Garcia', 'Brown', 'Nguyen', 'Patel', 'Kim', 'Lopez', 'Clark', 'Young',
+              'Hall', 'Allen', 'King', 'Wright', 'Scott', 'Green', 'Baker', 'Adams', 'Nelson', 'Hill']
+CHATTER = [
+    "Who's in this week?",
+    "Forecast looks light, maybe 5 knots out of the south",
+    "Need one more crew for tonight if anyone is free",
+    "Great sailing everyone",
+    "Anyone have a spare shackle I can borrow?",
+    "Photos from last week are up",
+    "Heading out early to practice starts",
+    "Storms might roll in around 6, will decide by 4",
+    "Thanks for the beers after the race",
+    "Can someone bring the committee boat key?",
+]
+MULTI_LINE_CHATTER = [
+    "Reminder for tonight:\nSkippers meeting at 6:15\nFirst warning at 6:55",
+    "Crew list so far:\nTwo people on the dock\nOne more maybe",
+    "Marina notes\n\nThe fuel dock is closed this week.\nPlease park in the upper lot.",
+]
+
+
+def boat_names(count: int, rng: random.Random) -> List[str]:
+    """``count`` distinct two-word boat names"""
+    names = [f"{a} {n}" for a in ADJECTIVES for n in NOUNS]
+    if count > len(names):
+        names += [f"{name} {k}" for k in range(2, count // len(names) + 2) for name in list(names)]
+    rng.shuffle(names)
+    return names[:count]
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    """Drop, double or swap one letter of a name"""
+    i = rng.randrange(1, len(name) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        typo = name[:i] + name[i + 1:]
+    elif kind == 1:
+        typo = name[:i] + name[i] + name[i:]
+    else:
+        typo = name[:i - 1] + name[i] + name[i - 1] + name[i + 1:]
+    return typo if typo.strip() else name
+
+
+def build_fleet(boats: int, reporters: int, alias_rate: float, rng: random.Random) -> Tuple[List[str], Dict]:
+    """Boat names and a boats.json dict: canonical and alias spellings, and one
+    skipper per boat (extra reporters are crew without a boat)"""
+    names = boat_names(boats, rng)
+    aliases: Dict[str, str] = {}
+    for name in names:
+        aliases[name.lower()] = name.lower()
+    for name in names:
+        if rng.random() < alias_rate:
+            typo = misspell(name.lower(), rng)
+            aliases.setdefault(typo, name.lower())
+    people = [f"{f} {l}" for f in FIRST_NAMES for l in LAST_NAMES]
+    people += [f"{p} {k}" for k in range(2, reporters // len(people) + 2) for p in list(people)]
+    rng.shuffle(people)
+    authors = people[:max(reporters, boats)]
+    author_to_boat = {authors[i].lower(): names[i].lower() for i in range(boats)}
+    return names, {'boat_aliases': aliases, 'substring_aliases': [], 'author_to_boat': author_to_boat,
+                   '_authors': authors}
+
+
+def format_line(timestamp: datetime, author: str, text: str) -> str:
+    """One message in the iOS export format: [M/D/YY, H:MM:SS PM] Author: text"""
+    hour = timestamp.hour % 12 or 12
+    meridiem = 'PM' if timestamp.hour >= 12 else 'AM'
+    return (f"[{timestamp.month}/{timestamp.day}/{timestamp.strftime('%y')}, "
+            f"{hour}:{timestamp.minute:02d}:{timestamp.second:02d} {meridiem}] {author}: {text}")
+
+
+def spoken_name(name: str, boats_json: Dict, misspell_rate: float, rng: random.Random) -> str:
+    """How a reporter writes a boat's name: canonical, a listed alias or a fresh typo"""
+    roll = rng.random()
+    if roll < misspell_rate:
+        return misspell(name, rng)
+    if roll < 2 * misspell_rate:
+        listed = [a for a, b in boats_json['boat_aliases'].items() if b == name.lower() and a != name.lower()]
+        if listed:
+            return rng.choice(listed).title()
+    return name
+
+
+def race_messages(date: datetime, names: List[str], boats_json: Dict, rng: random.Random, starters: int,
+                  misspell_rate: float, novice_rate: float, penalty_rate: float, contradiction_rate: float,
+                  full_order_rate: float) -> List[Tuple[datetime, str, str]]:
+    """One Wednesday's race reports as (timestamp, author, text)"""
+    authors = boats_json['_authors']
+    fleet = rng.sample(range(len(names)), min(starters, len(names)))  # true finish order
+    messages = []
+    start = date.replace(hour=19)
+    for place, boat in enumerate(fleet):
+        if rng.random() < 0.15:
+            continue  # this skipper did not report
+        parts = []
+        ahead = names[fleet[place - 1]] if place > 0 else None
+        behind = names[fleet[place + 1]] if place + 1 < len(fleet) else None
+        if rng.random() < contradiction_rate:
+            ahead, behind = behind, ahead
+        if ahead:
+            parts.append(f"{spoken_name(ahead, boats_json, misspell_rate, rng)} ahead")
+        else:
+            parts.append("No one ahead")
+        if behind:
+            parts.append(f"{spoken_name(behind, boats_json, misspell_rate, rng)} behind")
+        text = ', '.join(parts) + '.'
+        if rng.random() < novice_rate:
+            count = rng.randint(1, 3)
+            text += f" {count} novice{'s' if count > 1 else ''} on board."
+        if rng.random() < penalty_rate:
+            text = rng.choice(["DNF, broke the vang. ", "We were DSQ, hit the mark. "]) + text
+        timestamp = start + timedelta(seconds=rng.randrange(4 * 3600))
+        messages.append((timestamp, authors[boat], text))
+    if rng.random() < full_order_rate and len(fleet) >= 3:
+        order = ', '.join(f"{_ordinal(k + 1)} {names[b]}" for k, b in enumerate(fleet))
+        messages.append((start + timedelta(hours=3, minutes=30), authors[rng.choice(fleet)], order))
+    return messages
+
+
+def _ordinal(n: int) -> str:
+    """1st, 2nd, 3rd, 4th, ..., 11th, 12th, 13th, 21st, ..."""
+    suffix = 'th' if n % 100 in (11, 12, 13) else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return f"{n}{suffix}"
+
+
+def chatter_messages(date: datetime, count: int, authors: List[str], rng: random.Random,
+                     multi_line_rate: float) -> List[Tuple[datetime, str, str]]:
+    """``count`` non-race messages spread over the week starting on ``date``"""
+    messages = []
+    for _ in range(count):
+        timestamp = date + timedelta(seconds=rng.randrange(7 * 86400))
+        if timestamp.weekday() == 2 and timestamp.hour >= 19:
+            timestamp -= timedelta(hours=12)  # keep race hours for race reports
+        roll = rng.random()
+        if roll < multi_line_rate:
+            text = rng.choice(MULTI_LINE_CHATTER)
+        elif roll < multi_line_rate + 0.03:
+            text = f"‎<attached: {rng.randrange(10 ** 8):08d}-PHOTO-{timestamp:%Y-%m-%d-%H-%M-%S}.jpg>"
+        else:
+            text = rng.choice(CHATTER)
+        messages.append((timestamp, rng.choice(authors), text))
+    return messages
+
+
+def generate_chat(out_dir: str, messages: int = 1000, boats: int = 15, weeks: int = 0, reporters: int = 0,
+                  starters: int = 20, seed: int = 0, alias_rate: float = 0.5, misspell_rate: float = 0.1,
+                  novice_rate: float = 0.2, penalty_rate: float = 0.03, contradiction_rate: float = 0.05,
+                  full_order_rate: float = 0.1, multi_line_rate: float = 0.05) -> Dict:
+    """Write _chat.txt and boats.json to ``out_dir``; returns a summary of what was generated.
+
+    ``weeks`` defaults to one race per 100 messages (4 to 520); ``reporters``
+    to one per boat. Roughly ``messages`` messages are written."""
+    rng = random.Random(seed)
+    weeks = weeks or max(4, min(520, messages // 100))
+    names, boats_json = build_fleet(boats, reporters or boats, alias_rate, rng)
+    authors = boats_json['_authors']
+    per_week = messages // weeks
+    os.makedirs(out_dir, exist_ok=True)
+    written = lines = 0
+    with open(os.path.join(out_dir, '_chat.txt'), 'w', encoding='utf-8', newline='\n') as f:
+        f.write(format_line(FIRST_WEDNESDAY - timedelta(days=3), GROUP_NAME,
+                            f"‎You created group “{GROUP_NAME}”") + '\n')
+        written = lines = 1
+        for week in range(weeks):
+            date = FIRST_WEDNESDAY + timedelta(weeks=week)
+            week_messages = race_messages(date, names, boats_json, rng, starters, misspell_rate, novice_rate,
+                                          penalty_rate, contradiction_rate, full_order_rate)
+            if week == weeks - 1:
+                per_week = messages - written
+            week_messages += chatter_messages(date, max(0, per_week - len(week_messages)), authors, rng,
+                                              multi_line_rate)
+            week_messages.sort()
+            for timestamp, author, text in week_messages:
+                line = format_line(timestamp, author, text)
+                f.write(line + '\n')
+                written += 1
+                lines += 1 + line.count('\n')
+    del boats_json['_authors']
+    with open(os.path.join(out_dir, 'boats.json'), 'w', encoding='utf-8') as f:
+        json.dump(boats_json, f, indent=2)
+    return {'messages': written, 'lines': lines, 'boats': boats, 'weeks': weeks, 'authors': len(authors),
+            'seed': seed}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Write a synthetic WNR chat export and boats.json")
+    arg_parser.add_argument('out_dir')
+    arg_parser.add_argument('--messages', type=int, default=1000)
+    arg_parser.add_argument('--boats', type=int, default=15)
+    arg_parser.add_argument('--weeks', type=int, default=0, help="race weeks (default: one per 100 messages, 4-520)")
+    arg_parser.add_argument('--reporters', type=int, default=0, help="distinct authors (default: one per boat)")
+    arg_parser.add_argument('--starters', type=int, default=20, help="boats per race (at most --boats)")
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--alias-rate', type=float, default=0.5, help="share of boats with a listed misspelling")
+    arg_parser.add_argument('--misspell-rate', type=float, default=0.1, help="share of mentions using a fresh typo")
+    arg_parser.add_argument('--novice-rate', type=float, default=0.2)
+    arg_parser.add_argument('--penalty-rate', type=float, default=0.03, help="share of reports with a DNF/DSQ")
+    arg_parser.add_argument('--contradiction-rate', type=float, default=0.05,
+                            help="share of reports with ahead/behind swapped")
+    arg_parser.add_argument('--full-order-rate', type=float, default=0.1,
+                            help="share of races with a posted complete finish order")
+    arg_parser.add_argument('--multi-line-rate', type=float, default=0.05)
+    args = arg_parser.parse_args()
+    summary = generate_chat(args.out_dir, args.messages, args.boats, args.weeks, args.reporters, args.starters,
+                            args.seed, args.alias_rate, args.misspell_rate, args.novice_rate, args.penalty_rate,
+                            args.contradiction_rate, args.full_order_rate, args.multi_line_rate)
+    print(json.dumps(summary))
+
+
+if __name__ == '__main__':
+    main()
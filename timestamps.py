@@ -0,0 +1,52 @@
+"""
+Fast decoding of WhatsApp export timestamps.
+
+Header lines carry timestamps like ``[4/9/25, 7:41:02 PM]``. Instead of
+normalizing spaces and running ``datetime.strptime`` on every message, the
+date and time groups captured by the header regexes are decoded with plain
+integer arithmetic. The date part is validated once and memoized, as every
+message of a day shares it. Results and rejected inputs match strptime with
+"%m/%d/%y, %I:%M:%S %p".
+"""
+
+from datetime import datetime
+from functools import lru_cache
+from typing import Tuple
+
+
+@lru_cache(maxsize=None)
+def decode_date(date_str: str) -> Tuple[int, int, int]:
+    """(year, month, day) of an M/D/YY date; raises ValueError if invalid"""
+    parts = date_str.split('/')
+    if len(parts) != 3 or not all(p.isdigit() for p in parts) or len(parts[2]) != 2 \
+            or not 1 <= len(parts[0]) <= 2 or not 1 <= len(parts[1]) <= 2:
+        raise ValueError(f"time data {date_str!r} does not match format '%m/%d/%y'")
+    month, day, year = int(parts[0]), int(parts[1]), int(parts[2])
+    # %y: 69-99 are 1969-1999, 00-68 are 2000-2068
+    year += 1900 if year >= 69 else 2000
+    datetime(year, month, day)  # range check
+    return year, month, day
+
+
+def decode_time(time_str: str) -> Tuple[int, int, int]:
+    """(hour, minute, second) of an H:MM:SS AM/PM time, whatever single space
+    (or none) separates the seconds from AM/PM; raises ValueError if invalid"""
+    meridiem = time_str[-2:].upper()
+    clock = time_str[:-2].rstrip().split(':')
+    if meridiem not in ('AM', 'PM') or len(clock) != 3 or not all(p.isdigit() for p in clock) \
+            or not 1 <= len(clock[0]) <= 2 or len(clock[1]) != 2 or len(clock[2]) != 2:
+        raise ValueError(f"time data {time_str!r} does not match format '%I:%M:%S %p'")
+    hour, minute, second = int(clock[0]), int(clock[1]), int(clock[2])
+    if not 1 <= hour <= 12 or minute > 59 or second > 59:
+        raise ValueError(f"time data {time_str!r} is out of range")
+    hour %= 12
+    if meridiem == 'PM':
+        hour += 12
+    return hour, minute, second
+
+
+def decode_timestamp(date_str: str, time_str: str) -> datetime:
+    """Timestamp of a message header from its date ('M/D/YY') and time ('H:MM:SS AM') groups"""
+    year, month, day = decode_date(date_str)
+    hour, minute, second = decode_time(time_str)
+    return datetime(year, month, day, hour, minute, second)
@@ -0,0 +1,80 @@
+"""
+Content-addressed cache of per-week race processing results.
+
+A week's entry is keyed by a hash of its messages, the boats.json contents
+and the parser version (a digest of the parsing source files), so any change
+to one of them simply misses the cache. Entries hold the output of
+EnhancedChatParser.process_weekly_race before the series-wide DNC pass.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, Iterable, Optional
+
+# Source files whose contents determine process_weekly_race output
+PARSER_SOURCES = ('parse_chat.py', 'boat_resolver.py', 'claim_graph.py', 'linear_extensions.py',
+                  'standings.py', 'week_cache.py', 'message_store.py', 'chat_index.py',
+                  'timestamps.py', 'evidence.py', 'boat_registry.py')
+
+_parser_version: Optional[str] = None
+
+
+def parser_version() -> str:
+    """Digest of the parser source files; changes whenever the parsing code does"""
+    global _parser_version
+    if _parser_version is None:
+        digest = hashlib.sha256()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in PARSER_SOURCES:
+            with open(os.path.join(here, name), 'rb') as f:
+                digest.update(name.encode('utf-8') + b'\0' + f.read() + b'\0')
+        _parser_version = digest.hexdigest()
+    return _parser_version
+
+
+def week_key(date: str, messages: Iterable, boats_digest: str, options: str = '') -> str:
+    """Cache key for one week: its date, messages, boats.json digest, parser
+    version and any parser options that change week output. Raw lines are left
+    out: scoring only reads a message's timestamp, author and text."""
+    digest = hashlib.sha256()
+    digest.update(f"{parser_version()}\0{options}\0{boats_digest}\0{date}\0".encode('utf-8'))
+    for msg in messages:
+        digest.update(f"{msg.timestamp.isoformat()}\0{msg.author}\0{msg.text}\0".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class WeekCache:
+    """On-disk store of processed weeks, one JSON file per key"""
+
+    def __init__(self, cache_dir: str):
+        self.weeks_dir = os.path.join(cache_dir, 'weeks')
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.weeks_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached week dict for key, or None"""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                week = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return week
+
+    def put(self, key: str, week: Dict):
+        """Store a week dict; written to a temp file and renamed so readers never see partial entries"""
+        os.makedirs(self.weeks_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.weeks_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(week, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise